@@ -0,0 +1,349 @@
+"""
+Read-only data API on the Flask server, for machine clients that want
+forecast numbers without the Dash UI or the full data file.
+
+    GET /api/v1/periods                         forecast periods
+    GET /api/v1/countries                       countries with forecasts
+    GET /api/v1/risk-categories                 risk category names
+    GET /api/v1/forecasts                       forecasts, filtered by query:
+        period=M-YYYY[,M-YYYY...]
+        country=CODE[,CODE...]
+        risk_category=NAME                      repeatable
+    GET /api/v1/periods/<M-YYYY>/forecasts      shorthands for the filters
+    GET /api/v1/countries/<CODE>/forecasts
+    GET /api/v1/risk-categories/<NAME>/forecasts
+
+Forecast listings take:
+    fields=a,b,...    projection (default: DEFAULT_FIELDS; "all" for every
+                      field). historical, covariates, regional_context and
+                      bluf are only sent when asked for.
+    format=json|ndjson|csv
+    limit=N           page size (default config.API_PAGE_SIZE)
+    cursor=TOKEN      from the previous page's next_cursor
+
+Rows come in (year, month, country code) order. Cursors are tied to the data
+version, so a page fetched after a data reload fails with 410 rather than
+silently mixing releases. json returns {"data", "next_cursor", "version"};
+ndjson and csv stream one record per line with the cursor in the
+X-Next-Cursor header. Responses carry an ETag of the data version and query.
+"""
+import base64
+import csv
+import hashlib
+import io
+import json
+from typing import Dict, Iterator, List, Optional
+
+from flask import Blueprint, Flask, Response, g, jsonify, request, stream_with_context
+import numpy as np
+
+import config
+from data_loader import get_loader
+import forecast_shards
+
+blueprint = Blueprint("api", __name__, url_prefix="/api/v1")
+
+DEFAULT_FIELDS = (
+    "country_code",
+    "country_name",
+    "month",
+    "year",
+    "predicted_fatalities",
+    "probability",
+    "risk_category",
+    "cohort",
+)
+ALL_FIELDS = DEFAULT_FIELDS + ("bluf", "covariates", "historical", "regional_context")
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@blueprint.errorhandler(ApiError)
+def _api_error(error: ApiError):
+    return jsonify({"error": error.message}), error.status
+
+
+@blueprint.before_request
+def _check_etag():
+    loader = get_loader()
+    g.api_loader = loader
+    g.api_etag = hashlib.sha1(
+        f"{loader.version}:{request.full_path}".encode("utf-8")
+    ).hexdigest()
+    if request.if_none_match.contains_weak(g.api_etag):
+        response = Response(status=304)
+        response.set_etag(g.api_etag)
+        return response
+    return None
+
+
+@blueprint.after_request
+def _set_etag(response):
+    if response.status_code == 200 and "api_etag" in g:
+        response.set_etag(g.api_etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = config.HTTP_CACHE_MAX_AGE
+    return response
+
+
+def _parse_period(value: str):
+    try:
+        month_str, year_str = value.split("-")
+        return int(month_str), int(year_str)
+    except ValueError:
+        raise ApiError(400, f"Invalid period {value!r}; expected M-YYYY")
+
+
+def _split(values: List[str]) -> List[str]:
+    return [part.strip() for value in values for part in value.split(",") if part.strip()]
+
+
+def _fields() -> List[str]:
+    requested = _split(request.args.getlist("fields"))
+    if not requested:
+        return list(DEFAULT_FIELDS)
+    if requested == ["all"]:
+        return list(ALL_FIELDS)
+    unknown = [f for f in requested if f not in ALL_FIELDS]
+    if unknown:
+        raise ApiError(400, f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+def _encode_cursor(version: str, position: int) -> str:
+    token = f"{version[:16]}:{position}".encode("ascii")
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, version: str) -> int:
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        cursor_version, position = token.split(":")
+        position = int(position)
+        if position < 0:
+            raise ValueError(position)
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError(400, "Invalid cursor")
+    if cursor_version != version[:16]:
+        raise ApiError(410, "Cursor is from an earlier data release; start again")
+    return position
+
+
+def select_rows(
+    loader,
+    periods: Optional[List[tuple]] = None,
+    countries: Optional[List[str]] = None,
+    risk_categories: Optional[List[str]] = None,
+) -> np.ndarray:
+    """
+    Store rows matching the filters, in (year, month, country code) order,
+    read off the loader's period x country grid.
+    """
+    store = loader.store
+    all_keys, grid = store.period_grid()
+    period_ids = np.arange(len(all_keys))
+    if periods is not None:
+        keys = np.array([year * 12 + month for month, year in periods], dtype=np.int64)
+        period_ids = np.searchsorted(all_keys, np.intersect1d(all_keys, keys))
+
+    codes = loader.countries if countries is None else sorted(
+        code for code in set(countries) if code in loader.country_ids
+    )
+    country_ids = np.array([loader.country_ids[code] for code in codes], dtype=np.int64)
+
+    rows = grid[np.ix_(period_ids, country_ids)].ravel()
+    rows = rows[rows >= 0]
+    if risk_categories is not None:
+        wanted = [i for i, name in enumerate(store.risk_categories) if name in risk_categories]
+        rows = rows[np.isin(store.risk[rows], wanted)]
+    return rows
+
+
+def _record(loader, row: int, fields: List[str], full: bool) -> Dict:
+    store = loader.store
+    summary = record = loader.record(row)
+    if full and loader.shard_dir is not None:
+        # Shard-only fields live in the country shard, not the summary
+        record = loader.get_forecast(
+            store.country_code(row), int(store.month[row]), int(store.year[row])
+        )
+    forecast = summary["forecast"]
+    out = {}
+    for field in fields:
+        if field in ("predicted_fatalities", "probability", "risk_category"):
+            out[field] = forecast.get(field)
+        elif field == "historical":
+            out[field] = record["historical"]["monthly_data"]
+        elif field == "regional_context":
+            # Resolved through the region index, which only the summary has
+            out[field] = summary.get(field)
+        else:
+            out[field] = record.get(field)
+    return out
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _stream(records: Iterator[Dict], fmt: str, fields: List[str]) -> Iterator[str]:
+    if fmt == "ndjson":
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for i, record in enumerate(records, 1):
+        writer.writerow([_csv_value(record[f]) for f in fields])
+        # Flush in chunks rather than per row
+        if i % 256 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _forecasts_response(periods=None, countries=None, risk_categories=None):
+    loader = g.api_loader
+    fields = _fields()
+    fmt = request.args.get("format", "json")
+    if fmt not in FORMATS:
+        raise ApiError(400, f"Unknown format {fmt!r}; use one of {', '.join(FORMATS)}")
+    try:
+        limit = int(request.args.get("limit", config.API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    if not 1 <= limit <= config.API_MAX_PAGE_SIZE:
+        raise ApiError(400, f"limit must be between 1 and {config.API_MAX_PAGE_SIZE}")
+    cursor = request.args.get("cursor")
+    start = _decode_cursor(cursor, loader.version) if cursor else 0
+
+    rows = select_rows(loader, periods, countries, risk_categories)
+    page = rows[start : start + limit].tolist()
+    end = start + len(page)
+    next_cursor = _encode_cursor(loader.version, end) if end < len(rows) else None
+    full = any(f in forecast_shards.SHARD_ONLY_FIELDS for f in fields)
+    records = (_record(loader, row, fields, full) for row in page)
+
+    if fmt == "json":
+        return jsonify(
+            {
+                "data": list(records),
+                "next_cursor": next_cursor,
+                "total": len(rows),
+                "version": loader.version,
+            }
+        )
+
+    headers = {"X-Total-Count": str(len(rows))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(
+        stream_with_context(_stream(records, fmt, fields)),
+        mimetype=FORMATS[fmt],
+        headers=headers,
+    )
+
+
+def _filters():
+    periods = _split(request.args.getlist("period"))
+    countries = _split(request.args.getlist("country"))
+    risk_categories = request.args.getlist("risk_category")
+    return (
+        [_parse_period(p) for p in periods] if periods else None,
+        countries or None,
+        risk_categories or None,
+    )
+
+
+@blueprint.route("/forecasts")
+def forecasts():
+    periods, countries, risk_categories = _filters()
+    return _forecasts_response(periods, countries, risk_categories)
+
+
+@blueprint.route("/periods/<period>/forecasts")
+def period_forecasts(period: str):
+    month, year = _parse_period(period)
+    if (year, month) not in g.api_loader.periods:
+        raise ApiError(404, f"No forecasts for period {period}")
+    _, countries, risk_categories = _filters()
+    return _forecasts_response([(month, year)], countries, risk_categories)
+
+
+@blueprint.route("/countries/<country_code>/forecasts")
+def country_forecasts(country_code: str):
+    if country_code not in g.api_loader.country_ids:
+        raise ApiError(404, f"No forecasts for country {country_code}")
+    periods, _, risk_categories = _filters()
+    return _forecasts_response(periods, [country_code], risk_categories)
+
+
+@blueprint.route("/risk-categories/<path:category>/forecasts")
+def risk_category_forecasts(category: str):
+    if category not in g.api_loader.store.risk_categories:
+        raise ApiError(404, f"Unknown risk category {category!r}")
+    periods, countries, _ = _filters()
+    return _forecasts_response(periods, countries, [category])
+
+
+@blueprint.route("/periods")
+def periods():
+    loader = g.api_loader
+    _, grid = loader.store.period_grid()
+    counts = (grid >= 0).sum(axis=1).tolist()
+    return jsonify(
+        {
+            "data": [
+                {"period": f"{month}-{year}", "month": month, "year": year, "countries": count}
+                for (year, month), count in zip(loader.periods, counts)
+            ],
+            "version": loader.version,
+        }
+    )
+
+
+@blueprint.route("/countries")
+def countries():
+    loader = g.api_loader
+    store = loader.store
+    counts = np.diff(loader.country_offsets)
+    return jsonify(
+        {
+            "data": [
+                {
+                    "country_code": code,
+                    "country_name": store.country_names[loader.country_ids[code]],
+                    "periods": int(counts[loader.country_ids[code]]),
+                }
+                for code in loader.countries
+            ],
+            "version": loader.version,
+        }
+    )
+
+
+@blueprint.route("/risk-categories")
+def risk_categories():
+    loader = g.api_loader
+    return jsonify({"data": list(loader.store.risk_categories), "version": loader.version})
+
+
+def init_app(server: Flask) -> None:
+    """Register the API blueprint on `server`."""
+    if config.API_ENABLED:
+        server.register_blueprint(blueprint)
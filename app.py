@@ -2,9 +2,19 @@ import os
 import dash
 from dash import dcc, html
 
+import api
+import compression
+import http_cache
+import metrics
+import warmup
+
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 app.title = "FAST Conflict Forecasts"
 server = app.server
+metrics.init_app(server)
+compression.init_app(server)
+http_cache.init_app(server)
+api.init_app(server)
 
 app.layout = html.Div(
     [
@@ -16,6 +26,8 @@ app.layout = html.Div(
 
 import callbacks
 
+warmup.install()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8050))
     app.run(host="127.0.0.1", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,48 @@
+// Clientside restyling of the landing-page choropleth.
+// Mirrors layout.create_map_figure using the arrays shipped in
+// the "map-period-data" store (see layout.get_map_period_data).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    map: {
+        update_main_map: function (scaleMode, periodValue, periodData, figure) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!scaleMode || !periodValue || !periodData || !figure) {
+                return noUpdate;
+            }
+            const values = periodData.periods[periodValue];
+            if (!values) {
+                return noUpdate;
+            }
+
+            const locations = [];
+            const text = [];
+            const predicted = [];
+            const z = [];
+            for (let i = 0; i < values.length; i++) {
+                // null: no forecast for this country in the period
+                if (values[i] === null) {
+                    continue;
+                }
+                locations.push(periodData.codes[i]);
+                text.push(periodData.names[i]);
+                predicted.push(values[i]);
+                // log1p so zero stays at 0
+                z.push(scaleMode === "log" ? (values[i] > 0 ? Math.log1p(values[i]) : 0) : values[i]);
+            }
+
+            const trace = Object.assign({}, figure.data[0], {
+                locations: locations,
+                text: text,
+                z: z,
+                customdata: predicted,
+            });
+            trace.colorbar = Object.assign({}, trace.colorbar, {
+                title: {
+                    text: scaleMode === "log"
+                        ? "log(1 + predicted fatalities)"
+                        : "Predicted fatalities",
+                },
+            });
+            return Object.assign({}, figure, {data: [trace]});
+        },
+    },
+});
@@ -0,0 +1,295 @@
+"""
+HTTP load test for a running server: requests per second and latency for
+the map and detail-page callbacks.
+
+Start the app (e.g. `gunicorn -c gunicorn.conf.py app:server`), then
+
+    python benchmarks/load_test.py http://127.0.0.1:8000
+    python benchmarks/load_test.py http://127.0.0.1:8000 -c 64 -d 30 --scenario detail
+
+Each client thread keeps one keep-alive connection and sends callback
+requests back to back, cycling through every country and forecast period
+found on the landing page. Scenarios:
+
+    map     the main-map figure callback (server-side map), or the landing
+            page, which carries the map figure, when the map is updated
+            clientside
+    detail  the detail page and its three chart callbacks
+
+Results are written as JSON.
+"""
+import argparse
+import datetime
+import http.client
+import itertools
+import json
+from pathlib import Path
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+CALLBACK_PATH = "/_dash-update-component"
+SCENARIOS = ["map", "detail"]
+CHARTS = ["temporal", "covariate", "symlog"]
+
+
+class Client:
+    """One keep-alive HTTP connection."""
+
+    def __init__(self, url: str, timeout: float, accept_encoding: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+        if accept_encoding:
+            self.headers["Accept-Encoding"] = accept_encoding
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, bytes]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        try:
+            conn = self._connection()
+            conn.request(method, self.prefix + path, body=data, headers=self.headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def callback_body(output: str, inputs: List[Tuple[str, str, object]], state=()) -> Dict:
+    """A _dash-update-component request body for a single-output callback."""
+    component, prop = output.split(".")
+
+    def spec(items):
+        return [{"id": i, "property": p, "value": v} for i, p, v in items]
+
+    return {
+        "output": output,
+        "outputs": {"id": component, "property": prop},
+        "inputs": spec(inputs),
+        "changedPropIds": [f"{i}.{p}" for i, p, _ in inputs],
+        "state": spec(state),
+    }
+
+
+def display_page(pathname: str) -> Dict:
+    return callback_body("page-content.children", [("url", "pathname", pathname)])
+
+
+def _find(component, component_id: str) -> Optional[Dict]:
+    """Props of the component with `component_id` in a serialized Dash tree."""
+    if isinstance(component, list):
+        for child in component:
+            found = _find(child, component_id)
+            if found is not None:
+                return found
+    elif isinstance(component, dict):
+        props = component.get("props", {})
+        if props.get("id") == component_id:
+            return props
+        return _find(props.get("children"), component_id)
+    return None
+
+
+def discover(client: Client) -> Dict:
+    """Countries, periods and callback wiring of the running app."""
+    status, body = client.request("GET", "/_dash-dependencies")
+    if status != 200:
+        raise RuntimeError(f"/_dash-dependencies returned {status}")
+    server_map = any(
+        dep["output"] == "main-map.figure" and not dep.get("clientside_function")
+        for dep in json.loads(body)
+    )
+
+    status, body = client.request("POST", CALLBACK_PATH, display_page("/"))
+    if status != 200:
+        raise RuntimeError(f"landing page callback returned {status}")
+    landing = json.loads(body)["response"]["page-content"]["children"]
+    periods = [o["value"] for o in _find(landing, "forecast-period-selector")["options"]]
+    countries = _find(landing, "main-map")["figure"]["data"][0]["locations"]
+    if not periods or not countries:
+        raise RuntimeError("no forecast periods or countries on the landing page")
+    return {"server_map": server_map, "periods": periods, "countries": countries}
+
+
+def scenario_requests(scenario: str, app: Dict) -> Iterator[Tuple[str, Dict]]:
+    """Endless (label, request body) stream for one scenario."""
+    if scenario == "map":
+        if not app["server_map"]:
+            return itertools.repeat(("display_page.landing", display_page("/")))
+        return (
+            (
+                "update_main_map",
+                callback_body(
+                    "main-map.figure",
+                    [("fatality-scale-mode", "value", scale), ("forecast-period-selector", "value", period)],
+                ),
+            )
+            for period, scale in itertools.cycle(
+                itertools.product(app["periods"], ["absolute", "log"])
+            )
+        )
+
+    def detail():
+        for code, period in itertools.cycle(itertools.product(app["countries"], app["periods"])):
+            month, year = (int(v) for v in period.split("-"))
+            yield "display_page.detail", display_page(f"/country/{code}/{period}")
+            context = {"country_code": code, "month": month, "year": year}
+            for chart in CHARTS:
+                yield (
+                    f"update_{chart}_chart",
+                    callback_body(f"{chart}-chart.figure", [("detail-context", "data", context)]),
+                )
+
+    return detail()
+
+
+def run_scenario(args, scenario: str, app: Dict) -> Dict:
+    deadline = time.perf_counter() + args.duration
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    response_bytes = [0]
+
+    def worker(offset: int) -> None:
+        client = Client(args.url, args.timeout, args.accept_encoding)
+        # Start each thread at a different point of the request stream
+        requests = itertools.islice(scenario_requests(scenario, app), offset, None)
+        local: Dict[str, List[float]] = {}
+        local_errors: Dict[str, int] = {}
+        nbytes = 0
+        for label, body in requests:
+            if time.perf_counter() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                status, data = client.request("POST", CALLBACK_PATH, body)
+            except (OSError, http.client.HTTPException):
+                status, data = None, b""
+            elapsed = (time.perf_counter() - start) * 1000
+            if status in (200, 204):
+                local.setdefault(label, []).append(elapsed)
+                nbytes += len(data)
+            else:
+                local_errors[label] = local_errors.get(label, 0) + 1
+        client.close()
+        with lock:
+            for label, samples in local.items():
+                latencies.setdefault(label, []).extend(samples)
+            for label, count in local_errors.items():
+                errors[label] = errors.get(label, 0) + count
+            response_bytes[0] += nbytes
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(i * 7,), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+
+    all_samples = [ms for samples in latencies.values() for ms in samples]
+    return {
+        "scenario": scenario,
+        "concurrency": args.concurrency,
+        "duration_s": wall_s,
+        "requests": len(all_samples),
+        "errors": sum(errors.values()),
+        "rps": len(all_samples) / wall_s,
+        "response_mb": response_bytes[0] / 1e6,
+        "latency": summarize(all_samples),
+        "by_callback": {label: summarize(samples) for label, samples in sorted(latencies.items())},
+        "errors_by_callback": errors,
+    }
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the map and detail callbacks.")
+    parser.add_argument("url", nargs="?", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="repeatable (default: %s)" % ", ".join(SCENARIOS),
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    parser.add_argument(
+        "--accept-encoding",
+        default="gzip, br",
+        help='Accept-Encoding header sent ("" for uncompressed responses)',
+    )
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    # Uncompressed: http.client does not decode Content-Encoding
+    app = discover(Client(args.url, args.timeout, ""))
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        result = run_scenario(args, scenario, app)
+        print(
+            f"{scenario}: {result['rps']:.1f} req/s, p50 {result['latency'].get('p50_ms', 0):.1f} ms, "
+            f"p99 {result['latency'].get('p99_ms', 0):.1f} ms, {result['errors']} errors",
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    output = json.dumps(
+        {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "url": args.url,
+            "countries": len(app["countries"]),
+            "periods": len(app["periods"]),
+            "server_map": app["server_map"],
+            "scenarios": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark harness for the data loader, figure builders and Dash callbacks.
+
+For each scenario (countries x periods) a synthetic data file is generated
+and compiled to a snapshot, then the benchmarks run in a fresh subprocess
+per load mode ("json" and "snapshot"), so load timings and peak RSS are
+not polluted by earlier runs. Results are written as JSON.
+
+    python benchmarks/run.py                          # default scenarios
+    python benchmarks/run.py --scenario 2000x120 --history-months 444 -o bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from synthetic_data import write_synthetic_data
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SCENARIOS = ["50x12", "200x120", "2000x12"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def time_call(
+    fn: Callable[[], object],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "repeat": repeat,
+    }
+
+
+def run_worker(mode: str, data_path: str, repeat: int, load_repeat: int) -> Dict:
+    """Run every benchmark against one data file, loading it via `mode`."""
+    os.environ["FAST_DATA_PATH"] = data_path
+    if mode == "json":
+        # Point at a snapshot that does not exist to force the JSON path
+        os.environ["FAST_SNAPSHOT_PATH"] = data_path + ".no-snapshot"
+    sys.path.insert(0, str(REPO_ROOT))
+
+    import data_loader
+
+    timings: Dict[str, Dict] = {}
+    loaders: List = []
+    timings["load_data"] = time_call(
+        lambda: loaders.append(data_loader.ForecastDataLoader()), load_repeat
+    )
+    loader = loaders[-1]
+    del loaders[:-1]
+    data_loader._loader = loader
+    rss_after_load = peak_rss_mb()
+
+    import app  # noqa: F401  (registers callbacks)
+    import callbacks
+    import covariate_viz
+    import layout
+    import symlog_viz
+    import temporal_viz
+
+    def clear_caches() -> None:
+        for cache in (
+            layout._map_figure_cache,
+            layout._map_period_data_cache,
+            layout._detail_page_cache,
+            layout._detail_chart_cache,
+            layout._compare_page_cache,
+        ):
+            cache.clear()
+
+    latest = loader.get_available_periods()[-1]
+    month, year = latest["month"], latest["year"]
+    countries = loader.get_all_countries()
+    code = countries[len(countries) // 2]
+    forecast = loader.get_forecast(code, month, year)
+    period_forecasts = loader.get_forecasts_for_period(month, year)
+    context = {"country_code": code, "month": month, "year": year}
+    detail_path = f"/country/{code}/{month}-{year}"
+    compare_codes = countries[: layout.COMPARE_MAX_COUNTRIES]
+    compare_path = f"/compare/{','.join(compare_codes)}/{month}-{year}"
+
+    benchmarks: Dict[str, Callable[[], object]] = {
+        # Loader accessors
+        "get_forecast": lambda: loader.get_forecast(code, month, year),
+        "get_all_countries": loader.get_all_countries,
+        "get_country_forecasts": lambda: loader.get_country_forecasts(code),
+        "get_latest_forecast_for_map": loader.get_latest_forecast_for_map,
+        "get_available_periods": loader.get_available_periods,
+        "get_forecasts_for_period": lambda: loader.get_forecasts_for_period(month, year),
+        "get_forecast_series": lambda: loader.get_forecast_series(code),
+        "get_history": lambda: loader.get_history(forecast),
+        "get_rolling_mean": lambda: loader.get_rolling_mean(forecast, 6),
+        "get_regional_comparison": lambda: loader.get_regional_comparison(forecast),
+        "get_forecasts_batch": lambda: loader.get_forecasts_batch(compare_codes),
+        # Figure and page builders, uncached
+        "create_map_figure.absolute": lambda: layout.create_map_figure(period_forecasts, "absolute"),
+        "create_map_figure.log": lambda: layout.create_map_figure(period_forecasts, "log"),
+        "create_landing_page": layout.create_landing_page,
+        "create_detail_page": lambda: layout.create_detail_page(code, month, year, loader),
+        "create_compare_page": lambda: layout.create_compare_page(compare_codes, month, year, loader),
+        "create_temporal_chart": lambda: temporal_viz.create_temporal_chart(forecast, loader),
+        "create_covariate_chart": lambda: covariate_viz.create_covariate_chart(forecast),
+        "create_symlog_chart": lambda: symlog_viz.create_symlog_chart(forecast, loader),
+        # Callbacks, called directly
+        "callback.display_page.landing": lambda: callbacks.display_page("/"),
+        "callback.display_page.detail": lambda: callbacks.display_page(detail_path),
+        "callback.display_page.compare": lambda: callbacks.display_page(compare_path),
+        "callback.update_main_map": lambda: callbacks.update_main_map("log", f"{month}-{year}"),
+        "callback.update_temporal_chart": lambda: callbacks.update_temporal_chart(context),
+        "callback.update_covariate_chart": lambda: callbacks.update_covariate_chart(context),
+        "callback.update_symlog_chart": lambda: callbacks.update_symlog_chart(context),
+    }
+    for name, fn in benchmarks.items():
+        if name.startswith("callback."):
+            timings[name + ".cold"] = time_call(fn, repeat, setup=clear_caches)
+            timings[name + ".warm"] = time_call(fn, repeat)
+        else:
+            timings[name] = time_call(fn, repeat)
+
+    return {
+        "loaded_from": loader.loaded_from,
+        "records": len(loader.store),
+        "peak_rss_mb_after_load": rss_after_load,
+        "peak_rss_mb": peak_rss_mb(),
+        "timings": timings,
+    }
+
+
+def run_scenario(
+    countries: int,
+    periods: int,
+    history_months: int,
+    repeat: int,
+    load_repeat: int,
+    workdir: Path,
+) -> Dict:
+    data_path = workdir / f"forecast_data_{countries}x{periods}.json"
+    start = time.perf_counter()
+    write_synthetic_data(str(data_path), countries, periods, history_months)
+    generate_s = time.perf_counter() - start
+
+    sys.path.insert(0, str(REPO_ROOT))
+    import forecast_snapshot
+
+    start = time.perf_counter()
+    snapshot_path = forecast_snapshot.build_snapshot(data_path)
+    build_snapshot_s = time.perf_counter() - start
+
+    runs = {}
+    for mode in ("json", "snapshot"):
+        proc = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--worker",
+                mode,
+                str(data_path),
+                "--repeat",
+                str(repeat),
+                "--load-repeat",
+                str(load_repeat),
+            ],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    return {
+        "countries": countries,
+        "periods": periods,
+        "history_months": history_months,
+        "data_file_mb": data_path.stat().st_size / 1e6,
+        "snapshot_file_mb": snapshot_path.stat().st_size / 1e6,
+        "generate_s": generate_s,
+        "build_snapshot_s": build_snapshot_s,
+        "runs": runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the fast-cm-map benchmarks.")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="COUNTRIESxPERIODS, repeatable (default: %s)" % ", ".join(DEFAULT_SCENARIOS),
+    )
+    parser.add_argument("--history-months", type=int, default=240)
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per benchmark")
+    parser.add_argument("--load-repeat", type=int, default=3, help="timed loads per run")
+    parser.add_argument("--workdir", help="where to write data files (default: a temp dir)")
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "DATA_PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, data_path = args.worker
+        print(json.dumps(run_worker(mode, data_path, args.repeat, args.load_repeat)))
+        return
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        scenarios = []
+        for spec in args.scenario or DEFAULT_SCENARIOS:
+            countries, periods = (int(v) for v in spec.lower().split("x"))
+            print(f"Running {countries} countries x {periods} periods...", file=sys.stderr)
+            scenarios.append(
+                run_scenario(
+                    countries,
+                    periods,
+                    args.history_months,
+                    args.repeat,
+                    args.load_repeat,
+                    Path(workdir),
+                )
+            )
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": scenarios,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
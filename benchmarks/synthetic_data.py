@@ -0,0 +1,149 @@
+"""
+Generate synthetic forecast_data.json files with the same shape as the
+published data, at arbitrary scale.
+
+    python benchmarks/synthetic_data.py out.json --countries 200 --periods 12
+"""
+import argparse
+import json
+import random
+from typing import List, Tuple
+
+RISK_CATEGORIES = [
+    "Near-certain no conflict",
+    "Improbable conflict",
+    "Probable conflict",
+    "Near-certain conflict",
+]
+COVARIATES = ["infant_mortality", "military_power"]
+
+
+def _risk_category(probability: float) -> str:
+    if probability < 0.01:
+        return RISK_CATEGORIES[0]
+    if probability < 0.5:
+        return RISK_CATEGORIES[1]
+    if probability < 0.99:
+        return RISK_CATEGORIES[2]
+    return RISK_CATEGORIES[3]
+
+
+def country_codes(n: int) -> List[str]:
+    """n distinct three-letter codes: AAA, AAB, ..."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26]
+        for i in range(n)
+    ]
+
+
+def forecast_periods(n: int, start: Tuple[int, int] = (2025, 12)) -> List[Tuple[int, int]]:
+    """n consecutive (year, month) periods starting at `start`."""
+    year, month = start
+    periods = []
+    for _ in range(n):
+        periods.append((year, month))
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return periods
+
+
+def write_synthetic_data(
+    path: str,
+    countries: int = 50,
+    periods: int = 12,
+    history_months: int = 240,
+    region_size: int = 20,
+    seed: int = 0,
+) -> None:
+    """
+    Write a synthetic forecast file. Records are streamed to disk one at a
+    time, so large files do not need to fit in memory.
+    """
+    rng = random.Random(seed)
+    codes = country_codes(countries)
+    names = {code: f"Country {code}" for code in codes}
+    period_list = forecast_periods(periods)
+
+    values = {
+        (code, period): (rng.random(), rng.random() * 1000)
+        for code in codes
+        for period in period_list
+    }
+
+    history_start = period_list[0][0] * 12 + period_list[0][1] - 1 - history_months
+    history_dates = [
+        f"{(history_start + i) // 12}-{(history_start + i) % 12 + 1:02d}"
+        for i in range(history_months)
+    ]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"metadata": ')
+        json.dump({"synthetic": True, "countries": countries, "periods": periods}, f)
+        f.write(', "forecasts": [')
+        first = True
+        for idx, code in enumerate(codes):
+            history = [
+                {"date": date, "fatalities": int(rng.expovariate(1 / 50))}
+                for date in history_dates
+            ]
+            region_start = (idx // region_size) * region_size
+            region = codes[region_start : region_start + region_size]
+            covariates = {key: round(rng.random() * 100, 1) for key in COVARIATES}
+
+            for year, month in period_list:
+                probability, predicted = values[(code, (year, month))]
+                record = {
+                    "country_code": code,
+                    "country_name": names[code],
+                    "month": month,
+                    "year": year,
+                    "forecast": {
+                        "predicted_fatalities": predicted,
+                        "probability": probability,
+                        "risk_category": _risk_category(probability),
+                    },
+                    "historical": {"monthly_data": history},
+                    "covariates": covariates,
+                    "regional_context": [
+                        {
+                            "country_code": other,
+                            "country_name": names[other],
+                            "probability": values[(other, (year, month))][0],
+                            "predicted_fatalities": values[(other, (year, month))][1],
+                        }
+                        for other in region
+                    ],
+                    "cohort": f"Region {idx // region_size}",
+                    "bluf": f"Synthetic summary for {names[code]}, {month}/{year}.",
+                }
+                if not first:
+                    f.write(", ")
+                json.dump(record, f)
+                first = False
+        f.write("]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--countries", type=int, default=50)
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument("--history-months", type=int, default=240)
+    parser.add_argument("--region-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_synthetic_data(
+        args.output,
+        countries=args.countries,
+        periods=args.periods,
+        history_months=args.history_months,
+        region_size=args.region_size,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
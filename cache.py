@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+import weakref
+
+_registry: "weakref.WeakSet[LRUCache]" = weakref.WeakSet()
+
+
+def all_caches() -> List["LRUCache"]:
+    """Every live LRUCache, e.g. for reporting hit rates."""
+    return sorted(_registry, key=lambda c: c.name)
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache with hit/miss counters.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int, name: str = ""):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> lock held while that key's value is being built
+        self._building: Dict[Hashable, threading.Lock] = {}
+        _registry.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `factory()` on a miss.
+        Concurrent misses on the same key wait for the first caller's build
+        instead of repeating it; builds of different keys run in parallel.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        if self.maxsize <= 0:
+            return factory()
+
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with build_lock:
+                with self._lock:
+                    value = self._data.get(key, missing)
+                if value is missing:
+                    value = factory()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                if self._building.get(key) is build_lock:
+                    del self._building[key]
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
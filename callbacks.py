@@ -1,7 +1,9 @@
-from dash import Input, Output, State, callback
+from dash import ClientsideFunction, Input, Output, State, callback, clientside_callback
 from dash.exceptions import PreventUpdate
 
+import config
 import layout
+import metrics
 from data_loader import get_loader
 from app import app  # noqa: F401  (ensures app is created before callbacks)
 
@@ -10,9 +12,11 @@ from app import app  # noqa: F401  (ensures app is created before callbacks)
     Output("page-content", "children"),
     Input("url", "pathname"),
 )
+@metrics.timed("callbacks.display_page")
 def display_page(pathname):
     """
-    Simple router between landing page and country detail pages.
+    Simple router between landing page, country detail pages and the
+    country comparison page.
     """
     if pathname is None or pathname == "/":
         return layout.create_landing_page()
@@ -29,7 +33,21 @@ def display_page(pathname):
             except Exception:
                 return layout.create_landing_page()
 
-            return layout.create_detail_page(country_code, month, year)
+            return layout.get_detail_page(country_code, month, year)
+
+    if pathname == "/compare" or pathname.startswith("/compare/"):
+        # /compare/{CODE},{CODE},.../{month}-{year}; period optional
+        parts = pathname.split("/")
+        codes = [c for c in parts[2].split(",") if c] if len(parts) >= 3 else []
+        month = year = None
+        if len(parts) >= 4:
+            try:
+                month_str, year_str = parts[3].split("-")
+                month = int(month_str)
+                year = int(year_str)
+            except Exception:
+                month = year = None
+        return layout.get_compare_page(codes, month, year)
 
     return layout.create_landing_page()
 
@@ -88,14 +106,62 @@ def month_change(month_year_value, current_pathname):
 
 
 @callback(
-    Output("main-map", "figure"),
-    Input("fatality-scale-mode", "value"),
-    Input("forecast-period-selector", "value"),
+    Output("url", "pathname", allow_duplicate=True),
+    Input("compare-countries", "value"),
+    Input("compare-period", "value"),
+    prevent_initial_call=True,
+)
+def compare_change(country_codes, period_value):
+    """
+    On the comparison page, update the URL when the selection changes.
+    """
+    if period_value is None:
+        raise PreventUpdate
+    return f"/compare/{','.join(country_codes or [])}/{period_value}"
+
+
+def _detail_chart(chart: str, context):
+    if not context:
+        raise PreventUpdate
+    figure = layout.get_detail_chart(
+        chart, context["country_code"], context["month"], context["year"]
+    )
+    if figure is None:
+        raise PreventUpdate
+    return figure
+
+
+@callback(
+    Output("temporal-chart", "figure"),
+    Input("detail-context", "data"),
 )
+def update_temporal_chart(context):
+    return _detail_chart("temporal", context)
+
+
+@callback(
+    Output("covariate-chart", "figure"),
+    Input("detail-context", "data"),
+)
+def update_covariate_chart(context):
+    return _detail_chart("covariate", context)
+
+
+@callback(
+    Output("symlog-chart", "figure"),
+    Input("detail-context", "data"),
+)
+def update_symlog_chart(context):
+    return _detail_chart("symlog", context)
+
+
+@metrics.timed("callbacks.update_main_map")
 def update_main_map(scale_mode, period_value):
     """
     Rebuild the main map when the user changes the fatality scale
-    or the forecast period.
+    or the forecast period. Only registered as a callback when
+    config.CLIENTSIDE_MAP is off; otherwise assets/map.js does this
+    in the browser.
     """
     if scale_mode is None or period_value is None:
         raise PreventUpdate
@@ -107,6 +173,22 @@ def update_main_map(scale_mode, period_value):
     except Exception:
         raise PreventUpdate
 
-    loader = get_loader()
-    forecasts_for_period = loader.get_forecasts_for_period(month=month, year=year)
-    return layout.create_map_figure(forecasts_for_period, scale_mode=scale_mode)
+    return layout.get_map_figure(get_loader(), month, year, scale_mode=scale_mode)
+
+
+if config.CLIENTSIDE_MAP:
+    clientside_callback(
+        ClientsideFunction(namespace="map", function_name="update_main_map"),
+        Output("main-map", "figure"),
+        Input("fatality-scale-mode", "value"),
+        Input("forecast-period-selector", "value"),
+        State("map-period-data", "data"),
+        State("main-map", "figure"),
+        prevent_initial_call=True,
+    )
+else:
+    callback(
+        Output("main-map", "figure"),
+        Input("fatality-scale-mode", "value"),
+        Input("forecast-period-selector", "value"),
+    )(update_main_map)
@@ -0,0 +1,102 @@
+from typing import Dict
+import numpy as np
+
+from figures import figure, get_month_name, quantize, vline
+import metrics
+
+# Months of history shown before the forecast horizons
+HISTORY_MONTHS = 24
+COLORS = ['#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd',
+          '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+def country_color(i: int) -> str:
+    return COLORS[i % len(COLORS)]
+
+@metrics.timed("comparison_viz.create_comparison_temporal_chart")
+def create_comparison_temporal_chart(batch: Dict, loader=None) -> Dict:
+    if loader is None:
+        from data_loader import get_loader
+        loader = get_loader()
+    
+    dates = [f'{year}-{month:02d}' for month, year in batch['periods']]
+    traces = []
+    
+    for i, code in enumerate(batch['codes']):
+        color = country_color(i)
+        found = np.flatnonzero(batch['rows'][i] >= 0)
+        if not len(found):
+            continue
+        
+        # Histories are shared across a country's periods; use the latest
+        month, year = batch['periods'][found[-1]]
+        forecast = loader.get_forecast(code, month, year)
+        if forecast is not None:
+            history_dates, fatalities = loader.get_history(forecast, HISTORY_MONTHS)
+            if len(fatalities):
+                traces.append({
+                    'type': 'scatter',
+                    'x': history_dates,
+                    'y': quantize(fatalities),
+                    'mode': 'lines',
+                    'name': batch['names'][i],
+                    'legendgroup': code,
+                    'showlegend': False,
+                    'line': {'color': color, 'width': 1},
+                    'opacity': 0.6
+                })
+        
+        traces.append({
+            'type': 'scatter',
+            'x': [dates[j] for j in found],
+            'y': quantize(batch['predicted'][i][found]),
+            'mode': 'lines+markers',
+            'name': batch['names'][i],
+            'legendgroup': code,
+            'line': {'color': color, 'width': 2},
+            'marker': {'size': 7}
+        })
+    
+    return figure(traces, {
+        'title': {'text': 'Monthly Fatalities: History and Forecast'},
+        'xaxis': {'title': {'text': ''}},
+        'yaxis': {'title': {'text': 'Fatalities'}},
+        'hovermode': 'x unified',
+        'height': 400,
+        'margin': {'l': 40, 'r': 20, 't': 60, 'b': 40},
+        'legend': {'orientation': 'h', 'yanchor': 'top', 'y': 1.12, 'xanchor': 'left', 'x': 0, 'font': {'size': 10}}
+    })
+
+@metrics.timed("comparison_viz.create_comparison_scatter")
+def create_comparison_scatter(batch: Dict, month: int, year: int) -> Dict:
+    traces = []
+    if (month, year) in batch['periods']:
+        j = batch['periods'].index((month, year))
+        for i, code in enumerate(batch['codes']):
+            if batch['rows'][i, j] < 0:
+                continue
+            traces.append({
+                'type': 'scatter',
+                'x': quantize(batch['probability'][i, j:j + 1], 4),
+                'y': quantize(batch['predicted'][i, j:j + 1]),
+                'mode': 'markers+text',
+                'name': batch['names'][i],
+                'legendgroup': code,
+                'showlegend': False,
+                'marker': {'size': 14, 'color': country_color(i), 'line': {'color': 'black', 'width': 1}},
+                'text': [batch['names'][i]],
+                'textposition': 'top center',
+                'customdata': [batch['risk_category'][i, j] or ''],
+                'hovertemplate': '%{text}<br>Probability: %{x:.3f}<br>Predicted: %{y:.1f}<br>%{customdata}<extra></extra>'
+            })
+    
+    threshold_line = {'dash': 'dash', 'width': 1, 'opacity': 0.7, 'color': 'blue'}
+    
+    return figure(traces, {
+        'title': {'text': f'Probability vs Predicted Fatalities - {get_month_name(month)} {year}'},
+        'xaxis': {'title': {'text': 'Probability of ≥25 Fatalities'}, 'range': [-0.05, 1.05]},
+        'yaxis': {'title': {'text': 'Predicted Fatalities'}, 'rangemode': 'tozero'},
+        'height': 400,
+        'margin': {'l': 40, 'r': 20, 't': 60, 'b': 40},
+        'hovermode': 'closest',
+        'shapes': [vline(x, **threshold_line) for x in (0.01, 0.50, 0.99)]
+    })
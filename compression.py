@@ -0,0 +1,88 @@
+"""
+gzip/brotli compression for Dash callback and layout responses.
+
+Figure payloads are large JSON and compress 5-10x, which matters most to
+users on slow connections. Brotli is used when the `brotli` package is
+installed and the client accepts it, gzip otherwise. Compressed bodies are
+kept in an LRU keyed by ETag (or a digest of the body when there is none),
+so a cached figure is compressed once rather than on every hit.
+"""
+import gzip
+import hashlib
+
+from flask import Flask, request
+
+from cache import LRUCache
+import config
+from data_loader import add_reload_listener
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+COMPRESSIBLE_PATHS = frozenset(
+    {"/", "/_dash-update-component", "/_dash-layout", "/_dash-dependencies"}
+)
+COMPRESSIBLE_PREFIXES = ("/api/",)
+GZIP_LEVEL = 6
+# Quality 5 is close to 11 on JSON at a fraction of the CPU
+BROTLI_QUALITY = 5
+
+_compressed_cache = LRUCache(config.COMPRESSED_CACHE_SIZE, name="compressed_response")
+add_reload_listener(lambda loader: _compressed_cache.clear())
+
+
+def choose_encoding(accept_encodings) -> str:
+    """Best supported content coding the client accepts, or ""."""
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br"
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip"
+    return ""
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def init_app(server: Flask) -> None:
+    """
+    Install the compression hook on `server`. Call before any hook that sets
+    ETags (after_request functions run in reverse registration order).
+    """
+    if not config.COMPRESSION_ENABLED:
+        return
+
+    @server.after_request
+    def _compress(response):
+        if request.path not in COMPRESSIBLE_PATHS and not request.path.startswith(
+            COMPRESSIBLE_PREFIXES
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+        data = response.get_data()
+        if len(data) < config.COMPRESSION_MIN_SIZE:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag or hashlib.sha1(data).hexdigest(), encoding)
+        body = _compressed_cache.get_or_create(key, lambda: compress(data, encoding))
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # The bytes differ per coding, so the validator is only weak
+            response.set_etag(etag, weak=True)
+        return response
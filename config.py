@@ -0,0 +1,80 @@
+"""
+Runtime settings, read once from environment variables at import.
+"""
+import os
+
+# Source forecast JSON; a compiled snapshot next to it is preferred when fresh
+DATA_PATH = os.environ.get("FAST_DATA_PATH", "data/forecast_data.json")
+# Defaults to DATA_PATH with a .snapshot suffix
+SNAPSHOT_PATH = os.environ.get("FAST_SNAPSHOT_PATH") or None
+
+# Seconds between checks of the data files for a new release; 0 disables
+# hot reload
+DATA_RELOAD_INTERVAL = float(os.environ.get("FAST_DATA_RELOAD_INTERVAL", "0"))
+
+# Serialized choropleth figures kept per (data version, period, scale mode)
+MAP_FIGURE_CACHE_SIZE = int(os.environ.get("FAST_MAP_FIGURE_CACHE_SIZE", "64"))
+
+# Restyle the landing-page map in the browser (clientside callback) instead
+# of a server round trip per period/scale change
+CLIENTSIDE_MAP = os.environ.get("FAST_CLIENTSIDE_MAP", "1") != "0"
+
+# Rendered detail pages kept per (country, month, year, data version)
+DETAIL_PAGE_CACHE_SIZE = int(os.environ.get("FAST_DETAIL_PAGE_CACHE_SIZE", "256"))
+
+# Detail-page chart figures kept per (chart, country, month, year, data version)
+DETAIL_CHART_CACHE_SIZE = int(os.environ.get("FAST_DETAIL_CHART_CACHE_SIZE", "768"))
+
+# Rolling-mean windows (months) precomputed for every country history
+ROLLING_WINDOWS = tuple(
+    int(w) for w in os.environ.get("FAST_ROLLING_WINDOWS", "3,6,12").split(",") if w.strip()
+)
+
+# Latency histograms, cache hit rates and the /metrics endpoint; set to 0 to
+# remove the instrumentation entirely
+METRICS_ENABLED = os.environ.get("FAST_METRICS", "1") != "0"
+
+# Country shards kept in memory when DATA_PATH is a shard directory
+# (see forecast_shards.py)
+SHARD_CACHE_SIZE = int(os.environ.get("FAST_SHARD_CACHE_SIZE", "64"))
+
+# Load the data in the gunicorn master before forking workers, so no worker
+# pays the first-hit load and pages are shared copy-on-write
+PRELOAD_DATA = os.environ.get("FAST_PRELOAD", "1") != "0"
+
+# ETag/Cache-Control on deterministic callback responses (see http_cache.py)
+HTTP_CACHE_ENABLED = os.environ.get("FAST_HTTP_CACHE", "1") != "0"
+# Seconds browsers and proxies may reuse a response without revalidating
+HTTP_CACHE_MAX_AGE = int(os.environ.get("FAST_HTTP_CACHE_MAX_AGE", "300"))
+
+# gzip/brotli compression of Dash callback and layout responses (see compression.py)
+COMPRESSION_ENABLED = os.environ.get("FAST_COMPRESSION", "1") != "0"
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("FAST_COMPRESSION_MIN_SIZE", "1024"))
+# Compressed payloads kept so repeat responses skip recompression
+COMPRESSED_CACHE_SIZE = int(os.environ.get("FAST_COMPRESSED_CACHE_SIZE", "256"))
+
+# Validate figure specs against the Plotly schema as they are built (slow;
+# for development). Off in production (see figures.py)
+VALIDATE_FIGURES = os.environ.get("FAST_VALIDATE_FIGURES", "0") == "1"
+
+# Gunicorn worker class and threads per worker (see gunicorn.conf.py)
+WORKER_CLASS = os.environ.get("FAST_WORKER_CLASS", "gthread")
+WORKER_THREADS = int(os.environ.get("FAST_WORKER_THREADS", "8"))
+
+# Precompute map figures, detail charts and detail pages into the caches at
+# startup (gunicorn master, before forking) and after each data reload
+WARMUP_ENABLED = os.environ.get("FAST_WARMUP", "0") != "0"
+# Warmup worker processes; 0 = one per CPU at boot, and in-process after a
+# reload (every gunicorn worker warms its own caches then, and each pool
+# process would load the data again)
+WARMUP_JOBS = int(os.environ.get("FAST_WARMUP_JOBS", "0"))
+
+# Rendered /compare pages kept per data version
+COMPARE_PAGE_CACHE_SIZE = int(os.environ.get("FAST_COMPARE_PAGE_CACHE_SIZE", "64"))
+
+# Read-only JSON/CSV data API under /api/v1 (see api.py)
+API_ENABLED = os.environ.get("FAST_API", "1") != "0"
+# Forecast rows per API page by default, and the most a client may ask for
+API_PAGE_SIZE = int(os.environ.get("FAST_API_PAGE_SIZE", "500"))
+API_MAX_PAGE_SIZE = int(os.environ.get("FAST_API_MAX_PAGE_SIZE", "5000"))
@@ -1,20 +1,23 @@
-import plotly.graph_objects as go
 from typing import Dict
 
-def create_covariate_chart(forecast: Dict) -> go.Figure:
+from figures import figure, quantize
+import metrics
+
+@metrics.timed("covariate_viz.create_covariate_chart")
+def create_covariate_chart(forecast: Dict) -> Dict:
     covariates = forecast['covariates']
     country_name = forecast['country_name']
     
     if not covariates:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No covariate data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=14)
-        )
-        fig.update_layout(height=350)
-        return fig
+        return figure([], {
+            'annotations': [{
+                'text': "No covariate data available",
+                'xref': "paper", 'yref': "paper",
+                'x': 0.5, 'y': 0.5, 'showarrow': False,
+                'font': {'size': 14}
+            }],
+            'height': 350
+        })
     
     covariate_labels = {
         'infant_mortality': 'Infant Mortality Rate',
@@ -41,25 +44,21 @@ def create_covariate_chart(forecast: Dict) -> go.Figure:
                 color = 'lightblue'
             colors_list.append(color)
     
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        y=categories,
-        x=percentiles,
-        orientation='h',
-        marker=dict(color=colors_list),
-        text=[f"{int(p)}%" for p in percentiles],
-        textposition='outside',
-        hovertemplate='%{y}<br>Percentile: %{x:.0f}%<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=f'{country_name} - Structural Risk Factors',
-        xaxis_title='Percentile',
-        yaxis_title='',
-        height=350,
-        margin=dict(l=150, r=40, t=40, b=40),
-        xaxis=dict(range=[0, 105])
-    )
+    traces = [{
+        'type': 'bar',
+        'y': categories,
+        'x': quantize(percentiles, 1),
+        'orientation': 'h',
+        'marker': {'color': colors_list},
+        'text': [f"{int(p)}%" for p in percentiles],
+        'textposition': 'outside',
+        'hovertemplate': '%{y}<br>Percentile: %{x:.0f}%<extra></extra>'
+    }]
     
-    return fig
\ No newline at end of file
+    return figure(traces, {
+        'title': {'text': f'{country_name} - Structural Risk Factors'},
+        'xaxis': {'title': {'text': 'Percentile'}, 'range': [0, 105]},
+        'yaxis': {'title': {'text': ''}},
+        'height': 350,
+        'margin': {'l': 150, 'r': 40, 't': 40, 'b': 40}
+    })
\ No newline at end of file
@@ -1,104 +1,465 @@
-from pathlib import Path
+import hashlib
 import json
-from typing import Dict, List, Optional
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache import LRUCache
+import config
+import forecast_shards
+import forecast_snapshot
+from forecast_store import ForecastRecord, ForecastStore, build_store
+import json_stream
+import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class ForecastDataLoader:
-    def __init__(self, data_path: str = "data/forecast_data.json"):
+    def __init__(
+        self,
+        data_path: str = config.DATA_PATH,
+        snapshot_path: Optional[str] = config.SNAPSHOT_PATH,
+    ):
         self.data_path = Path(data_path)
-        self.data: Optional[Dict] = None
-        # (country_code, month, year) -> forecast dict
-        self.forecasts_by_country_month: Dict[tuple, Dict] = {}
+        # A directory means the sharded layout of forecast_shards.py: only
+        # the summary is loaded up front, country shards on demand
+        self.shard_dir: Optional[Path] = self.data_path if self.data_path.is_dir() else None
+        self._countries_dir: Optional[str] = None
+        self._shards = LRUCache(config.SHARD_CACHE_SIZE, name="country_shard")
+        # Binary snapshot built by forecast_snapshot.py; preferred when fresh
+        self.snapshot_path = (
+            Path(snapshot_path)
+            if snapshot_path
+            else forecast_snapshot.default_snapshot_path(self.data_path)
+        )
+        # "snapshot", "json" or "shards", whichever load_data last used
+        self.loaded_from: Optional[str] = None
+        # sha256 of the source JSON; identifies the data release in cache keys
+        self.version: str = ""
+        self.store: Optional[ForecastStore] = None
+        self.metadata: Dict = {}
+        # The indexes are NumPy arrays plus a few per-period and per-country
+        # tables; forecast dicts are ForecastRecord views made per lookup.
+        # Nothing is kept per row, so forked workers share the pages.
+        # distinct (year, month) pairs, sorted
+        self.periods: List[Tuple[int, int]] = []
+        # (month, year) -> row of store.period_grid()
+        self._period_index: Dict[Tuple[int, int], int] = {}
+        self.countries: List[str] = []
+        # country_code -> index into store.country_codes, for the countries
+        # with forecasts (the store also holds regional-context neighbours)
+        self.country_ids: Dict[str, int] = {}
+        # Store rows ordered by (country, year, month): country i's forecasts
+        # are rows country_rows[country_offsets[i]:country_offsets[i + 1]]
+        self.country_rows: np.ndarray = np.empty(0, dtype=np.int64)
+        self.country_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
         self.load_data()
 
+    @metrics.timed("loader.load_data")
     def load_data(self) -> None:
-        """Load JSON data and build the (country, month, year) index."""
-        with self.data_path.open("r", encoding="utf-8") as f:
-            self.data = json.load(f)
-
-        self.forecasts_by_country_month.clear()
-        for forecast in self.data["forecasts"]:
-            key = (
-                forecast["country_code"],
-                forecast["month"],
-                forecast["year"],
+        """
+        Load the columnar store and build the lookup indexes. Memory-maps
+        the binary snapshot when it is fresh, otherwise streams the JSON
+        record by record into the store.
+        """
+        self.store, self.metadata = self._load_store()
+        self._build_indexes()
+
+    def _load_store(self) -> Tuple[ForecastStore, Dict]:
+        if self.shard_dir is not None:
+            store, metadata, header = forecast_snapshot.read_snapshot(
+                forecast_shards.summary_path(self.shard_dir)
             )
-            self.forecasts_by_country_month[key] = forecast
+            self.loaded_from = "shards"
+            self.version = header["source"].get("sha256", "")
+            self._countries_dir = header["source"]["countries_dir"]
+            return store, metadata
+
+        if forecast_snapshot.is_fresh(self.snapshot_path, self.data_path):
+            try:
+                store, metadata, header = forecast_snapshot.read_snapshot(self.snapshot_path)
+                self.loaded_from = "snapshot"
+                self.version = header["source"].get("sha256", "")
+                return store, metadata
+            except (OSError, ValueError):
+                logger.exception("Could not read snapshot %s", self.snapshot_path)
+        elif self.snapshot_path.exists():
+            logger.warning("Snapshot %s is stale, loading JSON", self.snapshot_path)
 
+        top_level: Dict = {}
+        digest = hashlib.sha256()
+        with self.data_path.open("rb") as f:
+            store = build_store(json_stream.iter_forecasts(f, top_level, digest=digest), top_level)
+        self.loaded_from = "json"
+        self.version = digest.hexdigest()
+        return store, top_level.get("metadata", {})
+
+    def _build_indexes(self) -> None:
+        # Build everything before assigning, so readers never observe a
+        # half-built index
+        store = self.store
+        periods, grid = store.period_grid()
+        country_rows = np.lexsort((store.month, store.year, store.country))
+        counts = np.bincount(store.country, minlength=len(store.country_codes))
+        country_offsets = np.concatenate(([0], np.cumsum(counts)))
+        codes = store.country_codes.to_list()
+
+        # Precompute derived arrays now rather than on the first request
+        for window in config.ROLLING_WINDOWS:
+            store.rolling_means(window)
+
+        self.periods = [((key - 1) // 12, (key - 1) % 12 + 1) for key in periods.tolist()]
+        self._period_index = {(month, year): i for i, (year, month) in enumerate(self.periods)}
+        self.country_ids = {
+            code: idx for idx, (code, count) in enumerate(zip(codes, counts.tolist())) if count
+        }
+        self.countries = sorted(self.country_ids)
+        self.country_rows = country_rows
+        self.country_offsets = country_offsets
+
+    def record(self, row: int) -> ForecastRecord:
+        """Forecast dict view of store row `row`."""
+        return ForecastRecord(self.store, row)
+
+    def _row(self, country_code: str, month: int, year: int) -> int:
+        """Store row of a country-month-year forecast, or -1."""
+        country = self.country_ids.get(country_code)
+        period = self._period_index.get((month, year))
+        if country is None or period is None:
+            return -1
+        return int(self.store.period_grid()[1][period, country])
+
+    def _rows_of_country(self, country_code: str) -> np.ndarray:
+        """Store rows of a country's forecasts, chronological."""
+        country = self.country_ids.get(country_code)
+        if country is None:
+            return self.country_rows[:0]
+        return self.country_rows[self.country_offsets[country] : self.country_offsets[country + 1]]
+
+    @metrics.timed("loader.get_forecast")
     def get_forecast(self, country_code: str, month: int, year: int) -> Optional[Dict]:
         """Return forecast for a given country-month-year, or None."""
-        key = (country_code, month, year)
-        return self.forecasts_by_country_month.get(key)
+        row = self._row(country_code, month, year)
+        if row < 0:
+            return None
+        if self.shard_dir is None:
+            return self.record(row)
+        # Sharded layout: the summary record lacks history, covariates and
+        # BLUF, and the shard record lacks regional context (regions are
+        # indexed in the summary); combine the two
+        shard_record = self._country_shard(country_code).get((month, year))
+        if shard_record is None:
+            return None
+        return ForecastRecord(shard_record.store, shard_record.row, summary=self.record(row))
+
+    def _country_shard(self, country_code: str) -> Dict[Tuple[int, int], ForecastRecord]:
+        return self._shards.get_or_create(country_code, lambda: self._load_shard(country_code))
 
+    def _load_shard(self, country_code: str) -> Dict[Tuple[int, int], ForecastRecord]:
+        path = forecast_shards.shard_path(self.shard_dir, self._countries_dir, country_code)
+        with path.open("r", encoding="utf-8") as f:
+            store = build_store(
+                (json.loads(line) for line in f if line.strip()),
+                omitted_fields=forecast_shards.SUMMARY_ONLY_FIELDS,
+            )
+        for window in config.ROLLING_WINDOWS:
+            store.rolling_means(window)
+        return {
+            (int(store.month[row]), int(store.year[row])): ForecastRecord(store, row)
+            for row in range(len(store))
+        }
+
+    @metrics.timed("loader.get_all_countries")
     def get_all_countries(self) -> List[str]:
-        countries = set()
-        for forecast in self.data["forecasts"]:
-            countries.add(forecast["country_code"])
-        return sorted(list(countries))
+        return list(self.countries)
 
+    @metrics.timed("loader.get_country_forecasts")
     def get_country_forecasts(self, country_code: str) -> List[Dict]:
         """
         Return all forecasts for a country, sorted chronologically.
         """
-        forecasts: List[Dict] = []
-        for forecast in self.data["forecasts"]:
-            if forecast["country_code"] == country_code:
-                forecasts.append(forecast)
-        return sorted(forecasts, key=lambda x: (x["year"], x["month"]))
+        return [self.record(row) for row in self._rows_of_country(country_code).tolist()]
+
+    @metrics.timed("loader.get_forecast_series")
+    def get_forecast_series(self, country_code: str) -> Tuple[List[str], List[float]]:
+        """
+        All forecast horizons for a country as ("YYYY-MM" dates, predicted
+        fatalities), chronological.
+        """
+        rows = self._rows_of_country(country_code)
+        store = self.store
+        dates = [
+            f"{year}-{month:02d}"
+            for year, month in zip(store.year[rows].tolist(), store.month[rows].tolist())
+        ]
+        return dates, store.predicted[rows].tolist()
 
+    @metrics.timed("loader.get_latest_forecast_for_map")
     def get_latest_forecast_for_map(self) -> Dict[str, Dict]:
         """
         Keep for fallback: latest forecast per country.
         Returns dict[country_code] -> forecast dict.
         """
-        latest_by_country: Dict[str, Dict] = {}
-
-        for forecast in self.data["forecasts"]:
-            country = forecast["country_code"]
-            month = forecast["month"]
-            year = forecast["year"]
-
-            if country not in latest_by_country:
-                latest_by_country[country] = forecast
-            else:
-                existing = latest_by_country[country]
-                if (year > existing["year"]) or (
-                    year == existing["year"] and month > existing["month"]
-                ):
-                    latest_by_country[country] = forecast
-
-        return latest_by_country
+        # Countries in order of first appearance, as the records were read
+        codes = self.store.country_codes
+        ends = self.country_offsets[1:]
+        return {
+            codes[country]: self.record(int(self.country_rows[ends[country] - 1]))
+            for country in np.flatnonzero(np.diff(self.country_offsets)).tolist()
+        }
 
+    @metrics.timed("loader.get_available_periods")
     def get_available_periods(self) -> List[Dict[str, int]]:
         """
         Return sorted list of distinct forecast periods as
         [{'year': YYYY, 'month': M}, ...].
         """
-        periods = set()
-        for forecast in self.data["forecasts"]:
-            periods.add((forecast["year"], forecast["month"]))
-        sorted_periods = sorted(periods, key=lambda t: (t[0], t[1]))
-        return [{"year": y, "month": m} for (y, m) in sorted_periods]
+        return [{"year": y, "month": m} for (y, m) in self.periods]
 
+    @metrics.timed("loader.get_forecasts_for_period")
     def get_forecasts_for_period(self, month: int, year: int) -> Dict[str, Dict]:
         """
         Return dict[country_code] -> forecast dict for the given month/year.
         """
-        forecasts_for_period: Dict[str, Dict] = {}
-        for forecast in self.data["forecasts"]:
-            if forecast["year"] == year and forecast["month"] == month:
-                forecasts_for_period[forecast["country_code"]] = forecast
-        return forecasts_for_period
+        period = self._period_index.get((month, year))
+        if period is None:
+            return {}
+        rows = self.store.period_grid()[1][period]
+        # In file order, as the records were read
+        rows = np.sort(rows[rows >= 0])
+        codes = self.store.country_codes
+        return {
+            codes[country]: self.record(row)
+            for row, country in zip(rows.tolist(), self.store.country[rows].tolist())
+        }
+
+    @metrics.timed("loader.get_history")
+    def get_history(
+        self, forecast: ForecastRecord, months: Optional[int] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Monthly history of `forecast` as (dates, fatalities array), or only
+        its last `months` entries.
+        """
+        store = forecast.store
+        start, end = store.history_bounds(forecast.row)
+        if months is not None:
+            start = max(start, end - months)
+        return store.history_dates.slice(start, end), store.history_fatalities[start:end]
+
+    @metrics.timed("loader.get_rolling_mean")
+    def get_rolling_mean(self, forecast: ForecastRecord, window: int) -> np.ndarray:
+        """
+        Trailing `window`-month mean aligned with get_history, NaN until the
+        window is full. Precomputed for config.ROLLING_WINDOWS.
+        """
+        store = forecast.store
+        start, end = store.history_bounds(forecast.row)
+        return store.rolling_means(window)[start:end]
+
+    @metrics.timed("loader.get_regional_comparison")
+    def get_regional_comparison(self, forecast: ForecastRecord) -> Dict[str, np.ndarray]:
+        """
+        Regional context of `forecast` as aligned arrays, limited to
+        neighbours with a forecast for the same period: names, probability,
+        predicted and risk_category (from each neighbour's own forecast)
+        and is_target. Resolved through the region index, in O(region size).
+        """
+        store = self.store
+        row = forecast.row
+        if forecast.store is not store:
+            # Shard record: regions are indexed in the summary store
+            row = self._row(forecast["country_code"], forecast["month"], forecast["year"])
+
+        members, rows = store.region_rows(row)
+        found = rows >= 0
+        countries = members[found]
+        rows = rows[found]
+        categories = np.array(store.risk_categories + [None], dtype=object)
+        return {
+            "names": np.array([store.country_names[c] for c in countries.tolist()], dtype=object),
+            "probability": store.probability[rows],
+            "predicted": store.predicted[rows],
+            "risk_category": categories[store.risk[rows]],
+            "is_target": countries == store.country[row],
+        }
+
+    @metrics.timed("loader.get_forecasts_batch")
+    def get_forecasts_batch(
+        self,
+        country_codes: List[str],
+        periods: Optional[List[Tuple[int, int]]] = None,
+    ) -> Dict[str, object]:
+        """
+        Forecasts of several countries over several (month, year) periods
+        (default: every available period) as aligned country x period
+        arrays, looked up in one pass:
+            codes, names         the known countries, in the order given
+            periods              the known periods as (month, year), sorted
+            rows                 store row, -1 where there is no forecast
+            probability, predicted
+                                 float arrays, NaN where there is no forecast
+            risk_category        object array of category or None
+        Unknown countries and periods are dropped.
+        """
+        store = self.store
+        codes = [code for code in dict.fromkeys(country_codes) if code in self.country_ids]
+        country_ids = np.array([self.country_ids[code] for code in codes], dtype=np.int64)
+
+        all_keys, grid = store.period_grid()
+        period_keys = all_keys
+        if periods is not None:
+            keys = np.array([year * 12 + month for month, year in periods], dtype=np.int64)
+            period_keys = np.intersect1d(all_keys, keys)
+        period_ids = np.searchsorted(all_keys, period_keys)
+
+        rows = grid[np.ix_(period_ids, country_ids)].T
+        found = rows >= 0
+        safe = np.where(found, rows, 0)
+        categories = np.array(store.risk_categories + [None], dtype=object)
+        return {
+            "codes": codes,
+            "names": [store.country_names[idx] for idx in country_ids.tolist()],
+            "periods": [((key - 1) % 12 + 1, (key - 1) // 12) for key in period_keys.tolist()],
+            "rows": rows,
+            "probability": np.where(found, store.probability[safe], np.nan),
+            "predicted": np.where(found, store.predicted[safe], np.nan),
+            "risk_category": categories[np.where(found, store.risk[safe], -1)],
+        }
 
     def get_metadata(self) -> Dict:
-        return self.data.get("metadata", {})
+        return self.metadata
+
+
+def _source_signature(loader: ForecastDataLoader) -> Tuple:
+    """Cheap change detector: (mtime, size) of the JSON and its snapshot."""
+    signature = []
+    for path in (loader.data_path, loader.snapshot_path):
+        try:
+            stat = path.stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class DataReloader(threading.Thread):
+    """
+    Background thread that polls the data files and, when they change,
+    builds a fresh ForecastDataLoader and swaps it in.
+
+    The new loader is fully built before the swap, and loaders are never
+    mutated afterwards: a callback that fetched its loader before the swap
+    keeps a consistent view until it returns.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name="forecast-data-reloader", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        signature = _source_signature(get_loader())
+        while not self._stop_event.wait(self.interval):
+            current = get_loader()
+            new_signature = _source_signature(current)
+            if new_signature == signature:
+                continue
+            signature = new_signature
+            try:
+                reload_loader()
+            except Exception:
+                # Keep serving the previous release; retry on the next change
+                logger.exception("Reloading forecast data failed")
 
 
 _loader: Optional[ForecastDataLoader] = None
+_loader_lock = threading.Lock()
+_reloader: Optional[DataReloader] = None
+_reload_listeners: List[Callable[[ForecastDataLoader], None]] = []
 
 
 def get_loader() -> ForecastDataLoader:
+    """
+    Return the current loader. Callers that make several lookups for one
+    response should call this once and reuse the result.
+    """
+    if _loader is None:
+        preload()
+    if _reloader is None and config.DATA_RELOAD_INTERVAL > 0:
+        start_reloader()
+    return _loader
+
+
+def start_reloader() -> None:
+    """Start this process's hot-reload thread if FAST_DATA_RELOAD_INTERVAL is set."""
+    global _reloader
+    if config.DATA_RELOAD_INTERVAL <= 0:
+        return
+    with _loader_lock:
+        if _reloader is None:
+            _reloader = DataReloader(config.DATA_RELOAD_INTERVAL)
+            _reloader.start()
+
+
+def preload() -> ForecastDataLoader:
+    """
+    Load the data without starting the hot-reload thread. Used by the
+    gunicorn master before forking (see gunicorn.conf.py): workers inherit
+    the loader and start their own reloader after the fork, since threads
+    do not survive it.
+    """
     global _loader
     if _loader is None:
-        _loader = ForecastDataLoader()
+        with _loader_lock:
+            if _loader is None:
+                _loader = ForecastDataLoader()
     return _loader
+
+
+def _reset_after_fork() -> None:
+    global _loader_lock, _reloader
+    _loader_lock = threading.Lock()
+    _reloader = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def reload_loader() -> ForecastDataLoader:
+    """
+    Build a new loader from the current data files and swap it in.
+    Listeners registered with add_reload_listener run after the swap.
+    """
+    global _loader
+    current = _loader
+    loader = ForecastDataLoader(
+        str(current.data_path) if current else config.DATA_PATH,
+        str(current.snapshot_path) if current else config.SNAPSHOT_PATH,
+    )
+    if current is not None and loader.version == current.version:
+        return current
+
+    with _loader_lock:
+        _loader = loader
+    logger.info("Loaded forecast data version %s from %s", loader.version[:12], loader.loaded_from)
+
+    for listener in list(_reload_listeners):
+        try:
+            listener(loader)
+        except Exception:
+            logger.exception("Reload listener %r failed", listener)
+    return loader
+
+
+def add_reload_listener(listener: Callable[[ForecastDataLoader], None]) -> None:
+    """Register `listener(new_loader)` to run after each data reload."""
+    _reload_listeners.append(listener)
@@ -0,0 +1,147 @@
+"""
+Helpers for building Plotly figures as plain dict specs.
+
+go.Figure / go.Scatter validate every property on construction and again
+on to_plotly_json(), which dominates the cost of a figure callback. The viz
+builders assemble the figure JSON directly instead and only run it through
+go.Figure when config.VALIDATE_FIGURES is set (FAST_VALIDATE_FIGURES=1 in
+development). Numeric arrays are rounded to what the charts display, which
+also shrinks the payload.
+
+Every figure carries its template: plotly.js has no way to register a
+template once and reference it by name. The default template is trimmed
+to the trace types and layout sections these figures use, which drops
+it from about 7 KB to 1.3 KB of JSON per figure. Where many figures ship
+together (the static export) the template is sent once and re-attached in
+the browser; see detach_template.
+
+Dash serializes callback output with plotly's JSON encoder; orjson is
+selected as its engine when installed.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import config
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    pio.json.config.default_engine = "orjson"
+
+# Trace types the viz modules build; template defaults for other types never apply
+TRACE_TYPES = ("bar", "choropleth", "scatter")
+# Template layout sections no figure uses: 3D, polar and ternary subplots, and
+# colour scales (the map sets its own, other charts use explicit colours)
+_UNUSED_LAYOUT = ("coloraxis", "colorscale", "polar", "scene", "ternary")
+
+_template = None
+
+
+def default_template() -> Dict:
+    """
+    The default Plotly template as JSON, as go.Figure would embed it,
+    limited to TRACE_TYPES and the layout sections in use.
+    """
+    global _template
+    if _template is None:
+        template = pio.templates[pio.templates.default].to_plotly_json()
+        _template = {
+            "data": {k: v for k, v in template["data"].items() if k in TRACE_TYPES},
+            "layout": {
+                k: v for k, v in template["layout"].items() if k not in _UNUSED_LAYOUT
+            },
+        }
+    return _template
+
+
+def figure(data: List[Dict], layout: Dict) -> Dict:
+    """
+    Figure JSON from trace and layout dicts. The spec is shared by the
+    figure caches and must not be mutated by callers.
+    """
+    spec = {"data": data, "layout": {"template": default_template(), **layout}}
+    if config.VALIDATE_FIGURES:
+        go.Figure(spec)  # raises ValueError on an invalid property
+    return spec
+
+
+def detach_template(spec: Dict) -> Dict:
+    """Copy of `spec` without its layout template."""
+    return {
+        "data": spec["data"],
+        "layout": {k: v for k, v in spec["layout"].items() if k != "template"},
+    }
+
+
+def attach_template(spec: Dict) -> Dict:
+    """Inverse of detach_template; re-attaches the shared default template."""
+    return {"data": spec["data"], "layout": {"template": default_template(), **spec["layout"]}}
+
+
+def quantize(values: Sequence[float], decimals: int = 2) -> List:
+    """
+    Round `values` to `decimals` places as a JSON-ready list. Whole numbers
+    become ints and NaN becomes None.
+    """
+    arr = np.round(np.asarray(values, dtype=float), decimals)
+    finite = np.isfinite(arr)
+    if not finite.all():
+        out = arr.astype(object)
+        out[~finite] = None
+        return out.tolist()
+    if np.array_equal(arr, np.trunc(arr)) and (np.abs(arr) < 2 ** 53).all():
+        return arr.astype(np.int64).tolist()
+    return arr.tolist()
+
+
+def vline(x: float, **line) -> Dict:
+    """Full-height vertical line shape, as fig.add_vline would add."""
+    opacity = line.pop("opacity", None)
+    shape = {
+        "type": "line",
+        "xref": "x",
+        "x0": x,
+        "x1": x,
+        "yref": "y domain",
+        "y0": 0,
+        "y1": 1,
+        "line": line,
+    }
+    if opacity is not None:
+        shape["opacity"] = opacity
+    return shape
+
+
+def hline(y: float, **line) -> Dict:
+    """Full-width horizontal line shape, as fig.add_hline would add."""
+    opacity = line.pop("opacity", None)
+    shape = {
+        "type": "line",
+        "xref": "x domain",
+        "x0": 0,
+        "x1": 1,
+        "yref": "y",
+        "y0": y,
+        "y1": y,
+        "line": line,
+    }
+    if opacity is not None:
+        shape["opacity"] = opacity
+    return shape
+
+
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def get_month_name(month: int) -> str:
+    """English month name for titles and labels (not locale-dependent)."""
+    return _MONTH_NAMES[month - 1] if 1 <= month <= 12 else str(month)
@@ -0,0 +1,146 @@
+"""
+Sharded data layout: a light summary plus one file per country.
+
+    <shard dir>/
+        summary.snapshot              every forecast without history,
+                                      covariates or BLUF, plus the region
+                                      index (forecast_snapshot format);
+                                      enough for the map, period lists,
+                                      dropdowns and regional comparisons
+        countries-<hash>/<CODE>.ndjson
+                                      that country's forecast records with
+                                      everything but regions, one JSON
+                                      object per line
+
+Pointing FAST_DATA_PATH at the directory makes ForecastDataLoader load only
+the summary at startup and read country shards on demand. Each build writes
+its shards to a new countries-<hash> directory and replaces the summary
+last, so a loader still serving the previous release never sees a mix.
+
+Build with:
+    python forecast_shards.py [data/forecast_data.json] [-o data/shards]
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import shutil
+from typing import Dict, Iterator, Optional
+
+import forecast_snapshot
+from forecast_store import build_store
+import json_stream
+
+SUMMARY_NAME = "summary.snapshot"
+# Fields left out of the summary and only kept in the country shards
+SHARD_ONLY_FIELDS = ("historical", "covariates", "bluf")
+# Fields only kept in the summary: regions are resolved against every
+# country's forecasts, which only the summary has
+SUMMARY_ONLY_FIELDS = ("regional_context", "region")
+# Shard files kept open at once while building
+_MAX_OPEN_FILES = 256
+
+
+def summary_path(shard_dir: Path) -> Path:
+    return shard_dir / SUMMARY_NAME
+
+
+def shard_path(shard_dir: Path, countries_dir: str, country_code: str) -> Path:
+    return shard_dir / countries_dir / f"{country_code}.ndjson"
+
+
+class _ShardWriter:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._files: Dict[str, object] = {}
+
+    def write(self, forecast: Dict) -> None:
+        code = forecast["country_code"]
+        f = self._files.get(code)
+        if f is None:
+            if len(self._files) >= _MAX_OPEN_FILES:
+                self.close()
+            f = (self.directory / f"{code}.ndjson").open("a", encoding="utf-8")
+            self._files[code] = f
+        f.write(json.dumps(forecast, ensure_ascii=False))
+        f.write("\n")
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def build_shards(source_path: Path, shard_dir: Path) -> Path:
+    """Split `source_path` into a summary snapshot and per-country shards."""
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    staging = shard_dir / "countries.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir()
+
+    writer = _ShardWriter(staging)
+    top_level: Dict = {}
+    digest = hashlib.sha256()
+
+    def summaries() -> Iterator[Dict]:
+        with source_path.open("rb") as f:
+            for forecast in json_stream.iter_forecasts(f, top_level, digest=digest):
+                writer.write({k: v for k, v in forecast.items() if k not in SUMMARY_ONLY_FIELDS})
+                yield {k: v for k, v in forecast.items() if k not in SHARD_ONLY_FIELDS}
+
+    try:
+        store = build_store(summaries(), top_level, omitted_fields=SHARD_ONLY_FIELDS)
+    finally:
+        writer.close()
+
+    sha256 = digest.hexdigest()
+    countries_dir = f"countries-{sha256[:16]}"
+    previous = _current_countries_dir(shard_dir)
+    if (shard_dir / countries_dir).exists():
+        # Rebuilt from the same source: the shards are identical, and a
+        # running loader may be reading them, so keep the existing ones
+        shutil.rmtree(staging)
+    else:
+        staging.rename(shard_dir / countries_dir)
+
+    stat = source_path.stat()
+    forecast_snapshot.write_snapshot(
+        store,
+        top_level.get("metadata", {}),
+        summary_path(shard_dir),
+        {
+            "path": source_path.name,
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "countries_dir": countries_dir,
+        },
+    )
+
+    # Keep the previous release's shards for loaders still serving it
+    for path in shard_dir.glob("countries-*"):
+        if path.name not in (countries_dir, previous):
+            shutil.rmtree(path)
+    return shard_dir
+
+
+def _current_countries_dir(shard_dir: Path) -> Optional[str]:
+    try:
+        return forecast_snapshot.read_header(summary_path(shard_dir))["source"].get("countries_dir")
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Split forecast JSON into a summary and per-country shards.")
+    parser.add_argument("source", nargs="?", default="data/forecast_data.json")
+    parser.add_argument("-o", "--output", default="data/shards", help="shard directory")
+    args = parser.parse_args()
+
+    output = build_shards(Path(args.source), Path(args.output))
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Binary snapshot of the forecast store.
+
+Compiling forecast_data.json into a snapshot lets workers skip json.load
+at startup: the snapshot is memory-mapped, so every worker on the host
+shares the same pages through the OS page cache.
+
+File layout:
+    8 bytes   magic (b"FASTSNAP")
+    8 bytes   little-endian header length
+    header    UTF-8 JSON: schema version, source hash, metadata,
+              string tables and {name: dtype/shape/offset} per array
+    arrays    raw array bytes, each aligned to 64 bytes
+
+Build with:
+    python forecast_snapshot.py [data/forecast_data.json] [-o out.snapshot]
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from forecast_store import ForecastStore, build_store
+import json_stream
+
+MAGIC = b"FASTSNAP"
+# Bump whenever the ForecastStore columns change
+SCHEMA_VERSION = 3
+_ALIGNMENT = 64
+
+
+def default_snapshot_path(data_path: Path) -> Path:
+    return data_path.with_suffix(".snapshot")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_info(source_path: Path, sha256: str) -> Dict:
+    stat = source_path.stat()
+    return {
+        "path": source_path.name,
+        "sha256": sha256,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def write_snapshot(
+    store: ForecastStore,
+    metadata: Dict,
+    snapshot_path: Path,
+    source: Optional[Dict] = None,
+) -> None:
+    """Write `store` to `snapshot_path` atomically (via a temp file + rename)."""
+    arrays, tables = store.to_columns()
+
+    layout: Dict[str, Dict] = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += array.nbytes
+
+    header = json.dumps(
+        {
+            "schema_version": SCHEMA_VERSION,
+            "source": source or {},
+            "metadata": metadata,
+            "tables": tables,
+            "arrays": layout,
+        }
+    ).encode("utf-8")
+    # Arrays start on an aligned boundary after the header
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+    header += b" " * (data_start - len(MAGIC) - 8 - len(header))
+
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+    tmp_path.replace(snapshot_path)
+
+
+def _read_header(snapshot_path: Path) -> Tuple[Dict, int]:
+    """Return (header, offset of the first array byte)."""
+    with snapshot_path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{snapshot_path} is not a forecast snapshot")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode("utf-8"))
+    return header, len(MAGIC) + 8 + length
+
+
+def read_header(snapshot_path: Path) -> Dict:
+    return _read_header(snapshot_path)[0]
+
+
+def read_snapshot(snapshot_path: Path) -> Tuple[ForecastStore, Dict, Dict]:
+    """
+    Memory-map a snapshot. Returns (store, metadata, header); the store's
+    arrays are read-only views into the mapping.
+    """
+    header, data_start = _read_header(snapshot_path)
+    if header.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{snapshot_path} has schema version {header.get('schema_version')}, "
+            f"expected {SCHEMA_VERSION}"
+        )
+
+    mapping = np.memmap(snapshot_path, dtype=np.uint8, mode="r")
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        raw = mapping[start : start + count * dtype.itemsize]
+        arrays[name] = raw.view(dtype).reshape(spec["shape"])
+
+    store = ForecastStore.from_columns(arrays, header["tables"])
+    return store, header["metadata"], header
+
+
+def is_fresh(snapshot_path: Path, source_path: Path) -> bool:
+    """
+    True if the snapshot exists, matches SCHEMA_VERSION and was built from
+    the current contents of `source_path`. Size and mtime are checked
+    first; the source is only hashed when they differ (e.g. after a copy).
+    A snapshot without its source file is considered fresh.
+    """
+    if not snapshot_path.exists():
+        return False
+    try:
+        header = read_header(snapshot_path)
+    except (OSError, ValueError):
+        return False
+    if header.get("schema_version") != SCHEMA_VERSION:
+        return False
+    if not source_path.exists():
+        return True
+
+    source = header.get("source", {})
+    stat = source_path.stat()
+    if source.get("size") != stat.st_size:
+        return False
+    if source.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    return source.get("sha256") == file_sha256(source_path)
+
+
+def build_snapshot(source_path: Path, snapshot_path: Optional[Path] = None) -> Path:
+    snapshot_path = snapshot_path or default_snapshot_path(source_path)
+    top_level: Dict = {}
+    digest = hashlib.sha256()
+    with source_path.open("rb") as f:
+        store = build_store(json_stream.iter_forecasts(f, top_level, digest=digest), top_level)
+    write_snapshot(
+        store,
+        top_level.get("metadata", {}),
+        snapshot_path,
+        _source_info(source_path, digest.hexdigest()),
+    )
+    return snapshot_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile forecast JSON into a binary snapshot.")
+    parser.add_argument("source", nargs="?", default="data/forecast_data.json")
+    parser.add_argument("-o", "--output", default=None, help="snapshot path")
+    args = parser.parse_args()
+
+    output = build_snapshot(Path(args.source), Path(args.output) if args.output else None)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
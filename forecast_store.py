@@ -0,0 +1,538 @@
+from array import array
+from collections.abc import Mapping
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class StringColumn:
+    """
+    Variable-length UTF-8 strings packed into one byte buffer plus offsets.
+    String i is data[offsets[i]:offsets[i + 1]].
+    """
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start = self.offsets[i]
+        end = self.offsets[i + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def slice(self, start: int, end: int) -> List[str]:
+        return [self[i] for i in range(start, end)]
+
+    def to_list(self) -> List[str]:
+        return self.slice(0, len(self))
+
+
+class _StringColumnBuilder:
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, value: str) -> None:
+        self._data += value.encode("utf-8")
+        self._offsets.append(len(self._data))
+
+    def build(self) -> StringColumn:
+        return StringColumn(
+            np.frombuffer(bytes(self._data), dtype=np.uint8),
+            np.frombuffer(self._offsets, dtype=np.int64),
+        )
+
+
+class _Interner:
+    """Map repeated strings (country codes, categories) to small integer ids."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.ids[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def _as_float(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _history_digest(monthly_data: List[Dict]) -> bytes:
+    points = [(point["date"], point["fatalities"]) for point in monthly_data]
+    return hashlib.blake2b(repr(points).encode("utf-8"), digest_size=16).digest()
+
+
+def _compact_numbers(values: np.ndarray) -> np.ndarray:
+    """Store all-integral float columns as int64 so they read back as ints."""
+    if len(values) and np.all(np.isfinite(values)) and np.all(values == np.floor(values)):
+        return values.astype(np.int64)
+    return values
+
+
+# Columns that hold small Python lists rather than arrays
+_TABLE_COLUMNS = ("risk_categories", "cohorts", "covariate_keys", "omitted_fields")
+_COLUMNS = (
+    "country", "country_codes", "country_names", "month", "year",
+    "predicted", "probability", "risk", "risk_categories", "cohort", "cohorts",
+    "bluf", "covariate_keys", "covariates",
+    "history", "history_offsets", "history_dates", "history_fatalities",
+    "region", "region_offsets", "region_members", "omitted_fields",
+)
+
+
+class ForecastStore:
+    """
+    Columnar representation of the `forecasts` list of forecast_data.json.
+
+    One row per forecast record. Scalar fields are typed NumPy columns;
+    country codes, risk categories and cohorts are interned into small
+    tables; monthly history lives in flat arrays indexed by offsets.
+    Identical histories (the same country across forecast periods) are
+    stored once.
+
+    Regional context is normalised into a region-membership index: each
+    distinct neighbour list is stored once as a region (country ids) and
+    rows point at their region. Neighbour values are not copied; they are
+    read from the neighbours' own rows for the same period. Values embedded
+    in a source regional_context are ignored, so a neighbour with no
+    forecast of its own for that period is listed without probability and
+    predicted fatalities (and left out of region_rows-based comparisons).
+    """
+
+    def __init__(self, columns: Dict[str, object]):
+        self.country: np.ndarray = columns["country"]
+        self.country_codes: StringColumn = columns["country_codes"]
+        self.country_names: StringColumn = columns["country_names"]
+        self.month: np.ndarray = columns["month"]
+        self.year: np.ndarray = columns["year"]
+        self.predicted: np.ndarray = columns["predicted"]
+        self.probability: np.ndarray = columns["probability"]
+        self.risk: np.ndarray = columns["risk"]
+        self.risk_categories: List[str] = list(columns["risk_categories"])
+        self.cohort: np.ndarray = columns["cohort"]
+        self.cohorts: List[str] = list(columns["cohorts"])
+        self.bluf: StringColumn = columns["bluf"]
+        self.covariate_keys: List[str] = list(columns["covariate_keys"])
+        self.covariates: np.ndarray = columns["covariates"]
+        self.history: np.ndarray = columns["history"]
+        self.history_offsets: np.ndarray = columns["history_offsets"]
+        self.history_dates: StringColumn = columns["history_dates"]
+        self.history_fatalities: np.ndarray = columns["history_fatalities"]
+        self.region: np.ndarray = columns["region"]
+        self.region_offsets: np.ndarray = columns["region_offsets"]
+        self.region_members: np.ndarray = columns["region_members"]
+        # Record fields the source records left out (e.g. a shard summary);
+        # ForecastRecord raises KeyError for these rather than returning blanks
+        self.omitted_fields: List[str] = list(columns["omitted_fields"])
+        # Values computed from the columns on first use; not serialized
+        self.derived: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self.country)
+
+    def to_columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+        """
+        Flatten the store into plain arrays and string tables, e.g. for
+        writing a snapshot. StringColumns become `<name>.data` and
+        `<name>.offsets` arrays.
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        tables: Dict[str, List[str]] = {}
+        for name in _COLUMNS:
+            value = getattr(self, name)
+            if name in _TABLE_COLUMNS:
+                tables[name] = list(value)
+            elif isinstance(value, StringColumn):
+                arrays[f"{name}.data"] = value.data
+                arrays[f"{name}.offsets"] = value.offsets
+            else:
+                arrays[name] = value
+        return arrays, tables
+
+    @classmethod
+    def from_columns(
+        cls, arrays: Dict[str, np.ndarray], tables: Dict[str, List[str]]
+    ) -> "ForecastStore":
+        """Inverse of to_columns; arrays are used as-is (no copy)."""
+        columns: Dict[str, object] = dict(tables)
+        for name, value in arrays.items():
+            if name.endswith(".data"):
+                base = name[: -len(".data")]
+                columns[base] = StringColumn(value, arrays[f"{base}.offsets"])
+            elif not name.endswith(".offsets"):
+                columns[name] = value
+        return cls(columns)
+
+    def rolling_means(self, window: int) -> np.ndarray:
+        """
+        Trailing `window`-month mean of every history, aligned with
+        history_fatalities; NaN until a history has `window` points.
+        Computed with one cumulative sum over the flat array, once per window.
+        """
+        key = ("rolling_means", window)
+        if key not in self.derived:
+            self.derived[key] = self._rolling_means(window)
+        return self.derived[key]
+
+    def _rolling_means(self, window: int) -> np.ndarray:
+        values = self.history_fatalities.astype(np.float64)
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        lengths = np.diff(self.history_offsets)
+        position = np.arange(len(values)) - np.repeat(self.history_offsets[:-1], lengths)
+
+        means = np.full(len(values), np.nan)
+        end = np.flatnonzero(position >= window - 1) + 1
+        means[end - 1] = (csum[end] - csum[end - window]) / window
+        return means
+
+    def period_grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (periods, grid): the distinct forecast periods as year * 12 + month,
+        sorted, and a (period x country) matrix of the row holding that
+        country's forecast for the period, -1 where there is none.
+        Computed once.
+        """
+        if "period_grid" not in self.derived:
+            period_key = self.year.astype(np.int64) * 12 + self.month
+            periods, period_id = np.unique(period_key, return_inverse=True)
+            grid = np.full((len(periods), len(self.country_codes)), -1, dtype=np.int64)
+            grid[period_id, self.country] = np.arange(len(self))
+            self.derived["period_grid"] = (periods, grid)
+        return self.derived["period_grid"]
+
+    def region_rows(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (members, rows): the country ids of `row`'s region, in regional
+        context order, and each member's row for the same period (-1 where
+        it has none). Empty when the row has no regional context.
+        """
+        region = self.region[row]
+        if region < 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        members = self.region_members[self.region_offsets[region] : self.region_offsets[region + 1]]
+        periods, grid = self.period_grid()
+        period = np.searchsorted(periods, int(self.year[row]) * 12 + int(self.month[row]))
+        return members, grid[period, members]
+
+    def country_code(self, row: int) -> str:
+        return self.country_codes[self.country[row]]
+
+    def country_name(self, row: int) -> str:
+        return self.country_names[self.country[row]]
+
+    def forecast_dict(self, row: int) -> Dict:
+        result: Dict = {}
+        predicted = self.predicted[row]
+        if not np.isnan(predicted):
+            result["predicted_fatalities"] = float(predicted)
+        probability = self.probability[row]
+        if not np.isnan(probability):
+            result["probability"] = float(probability)
+        risk = self.risk[row]
+        if risk >= 0:
+            result["risk_category"] = self.risk_categories[risk]
+        return result
+
+    def history_bounds(self, row: int) -> tuple:
+        slot = self.history[row]
+        return int(self.history_offsets[slot]), int(self.history_offsets[slot + 1])
+
+    def monthly_data(self, row: int) -> List[Dict]:
+        start, end = self.history_bounds(row)
+        dates = self.history_dates.slice(start, end)
+        fatalities = self.history_fatalities[start:end].tolist()
+        return [{"date": d, "fatalities": f} for d, f in zip(dates, fatalities)]
+
+    def covariates_dict(self, row: int) -> Dict[str, float]:
+        values = self.covariates[row]
+        return {
+            key: float(value)
+            for key, value in zip(self.covariate_keys, values)
+            if not np.isnan(value)
+        }
+
+    def regional_context(self, row: int) -> List[Dict]:
+        """
+        `row`'s neighbours in source order, each with the probability and
+        predicted fatalities of its own forecast for the same period; code
+        and name only for a neighbour without one.
+        """
+        members, rows = self.region_rows(row)
+        context = []
+        for country, member_row in zip(members.tolist(), rows.tolist()):
+            entry = {
+                "country_code": self.country_codes[country],
+                "country_name": self.country_names[country],
+            }
+            if member_row >= 0:
+                probability = self.probability[member_row]
+                if not np.isnan(probability):
+                    entry["probability"] = float(probability)
+                predicted = self.predicted[member_row]
+                if not np.isnan(predicted):
+                    entry["predicted_fatalities"] = float(predicted)
+            context.append(entry)
+        return context
+
+
+class _Missing:
+    pass
+
+
+_MISSING = _Missing()
+
+
+def _cohort(store: ForecastStore, row: int):
+    cohort = store.cohort[row]
+    return store.cohorts[cohort] if cohort >= 0 else _MISSING
+
+
+def _regional_context(store: ForecastStore, row: int):
+    return store.regional_context(row) if store.region[row] >= 0 else _MISSING
+
+
+_RECORD_FIELDS = {
+    "country_code": lambda s, r: s.country_code(r),
+    "country_name": lambda s, r: s.country_name(r),
+    "month": lambda s, r: int(s.month[r]),
+    "year": lambda s, r: int(s.year[r]),
+    "forecast": lambda s, r: s.forecast_dict(r),
+    "historical": lambda s, r: {"monthly_data": s.monthly_data(r)},
+    "covariates": lambda s, r: s.covariates_dict(r),
+    "regional_context": _regional_context,
+    "cohort": _cohort,
+    "bluf": lambda s, r: s.bluf[r],
+}
+
+
+class ForecastRecord(Mapping):
+    """
+    Read-only dict view of one row of a ForecastStore.
+
+    Behaves like the forecast dicts of the original JSON; nested values
+    are materialised on access and not kept. Fields the store omits are
+    read from `summary`, the same forecast's record in another store, if
+    given (a country shard record takes its regional context from the
+    shard summary), and are otherwise missing.
+    """
+
+    __slots__ = ("store", "row", "summary")
+
+    def __init__(self, store: ForecastStore, row: int, summary: Optional["ForecastRecord"] = None):
+        self.store = store
+        self.row = row
+        self.summary = summary
+
+    def __getitem__(self, key: str):
+        getter = _RECORD_FIELDS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        if key in self.store.omitted_fields:
+            if self.summary is None:
+                raise KeyError(key)
+            return self.summary[key]
+        value = getter(self.store, self.row)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _RECORD_FIELDS:
+            if key in self.store.omitted_fields:
+                if self.summary is not None and key in self.summary:
+                    yield key
+                continue
+            if key == "cohort" and self.store.cohort[self.row] < 0:
+                continue
+            if key == "regional_context" and self.store.region[self.row] < 0:
+                continue
+            yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return (
+            f"ForecastRecord({self.store.country_code(self.row)}, "
+            f"{self.store.month[self.row]}-{self.store.year[self.row]})"
+        )
+
+
+def build_store(
+    forecasts: Iterable[Dict],
+    top_level: Optional[Dict] = None,
+    omitted_fields: Iterable[str] = (),
+) -> ForecastStore:
+    """
+    Build a ForecastStore from forecast dicts. Records are consumed one at
+    a time, so `forecasts` may be a generator. `omitted_fields` names the
+    record fields the forecasts were stripped of.
+
+    A forecast's region comes from its `regional_context` list, or, in
+    files that already normalise regions, from a "region" name looked up in
+    top_level["regions"] ({name: [country codes]}). The lookup happens once
+    `forecasts` is exhausted, as json_stream.iter_forecasts only fills
+    `top_level` then.
+    """
+    countries = _Interner()
+    country_names: Dict[int, str] = {}
+    risk_categories = _Interner()
+    cohorts = _Interner()
+    covariate_keys = _Interner()
+
+    country = array("i")
+    month = array("h")
+    year = array("h")
+    predicted = array("d")
+    probability = array("d")
+    risk = array("h")
+    cohort = array("i")
+    bluf = _StringColumnBuilder()
+    covariate_rows: List[Dict[int, float]] = []
+
+    history = array("i")
+    history_slots: Dict[bytes, int] = {}
+    history_offsets = array("q", [0])
+    history_dates = _StringColumnBuilder()
+    history_fatalities = array("d")
+
+    region = array("i")
+    region_ids: Dict[tuple, int] = {}
+    region_offsets = array("q", [0])
+    region_members = array("i")
+    region_names = _Interner()
+
+    def intern_country(code: str, name: Optional[str]) -> int:
+        idx = countries.intern(code)
+        if idx not in country_names and name is not None:
+            country_names[idx] = name
+        return idx
+
+    def intern_region(members: tuple) -> int:
+        if not members:
+            return -1
+        idx = region_ids.get(members)
+        if idx is None:
+            idx = len(region_ids)
+            region_ids[members] = idx
+            region_members.extend(members)
+            region_offsets.append(len(region_members))
+        return idx
+
+    for forecast in forecasts:
+        country.append(intern_country(forecast["country_code"], forecast.get("country_name")))
+        month.append(forecast["month"])
+        year.append(forecast["year"])
+
+        values = forecast.get("forecast") or {}
+        predicted.append(_as_float(values.get("predicted_fatalities")))
+        probability.append(_as_float(values.get("probability")))
+        category = values.get("risk_category")
+        risk.append(risk_categories.intern(category) if category is not None else -1)
+
+        cohort_name = forecast.get("cohort")
+        cohort.append(cohorts.intern(cohort_name) if cohort_name is not None else -1)
+        bluf.append(forecast.get("bluf") or "")
+
+        covariate_rows.append(
+            {
+                covariate_keys.intern(key): _as_float(value)
+                for key, value in (forecast.get("covariates") or {}).items()
+            }
+        )
+
+        monthly_data = (forecast.get("historical") or {}).get("monthly_data") or []
+        digest = _history_digest(monthly_data)
+        slot = history_slots.get(digest)
+        if slot is None:
+            slot = len(history_slots)
+            history_slots[digest] = slot
+            for point in monthly_data:
+                history_dates.append(point["date"])
+                history_fatalities.append(_as_float(point["fatalities"]))
+            history_offsets.append(len(history_fatalities))
+        history.append(slot)
+
+        region_name = forecast.get("region")
+        if region_name is not None:
+            # Placeholder below -1 until top_level["regions"] is read
+            region.append(-2 - region_names.intern(region_name))
+        else:
+            region.append(
+                intern_region(
+                    tuple(
+                        intern_country(neighbour["country_code"], neighbour.get("country_name"))
+                        for neighbour in forecast.get("regional_context") or []
+                    )
+                )
+            )
+
+    region_column = np.frombuffer(region, dtype=np.int32)
+    if region_names.values:
+        table = (top_level or {}).get("regions") or {}
+        resolved = np.array(
+            [
+                intern_region(tuple(intern_country(code, None) for code in table.get(name) or []))
+                for name in region_names.values
+            ],
+            dtype=np.int32,
+        )
+        region_column = region_column.copy()
+        named = region_column <= -2
+        region_column[named] = resolved[-2 - region_column[named]]
+
+    covariates = np.full((len(covariate_rows), len(covariate_keys.values)), np.nan)
+    for row, values in enumerate(covariate_rows):
+        for key, value in values.items():
+            covariates[row, key] = value
+
+    code_column = _StringColumnBuilder()
+    name_column = _StringColumnBuilder()
+    for idx, code in enumerate(countries.values):
+        code_column.append(code)
+        name_column.append(country_names.get(idx, code))
+
+    return ForecastStore(
+        {
+            "country": np.frombuffer(country, dtype=np.int32),
+            "country_codes": code_column.build(),
+            "country_names": name_column.build(),
+            "month": np.frombuffer(month, dtype=np.int16),
+            "year": np.frombuffer(year, dtype=np.int16),
+            "predicted": np.frombuffer(predicted, dtype=np.float64),
+            "probability": np.frombuffer(probability, dtype=np.float64),
+            "risk": np.frombuffer(risk, dtype=np.int16),
+            "risk_categories": risk_categories.values,
+            "cohort": np.frombuffer(cohort, dtype=np.int32),
+            "cohorts": cohorts.values,
+            "bluf": bluf.build(),
+            "covariate_keys": covariate_keys.values,
+            "covariates": covariates,
+            "history": np.frombuffer(history, dtype=np.int32),
+            "history_offsets": np.frombuffer(history_offsets, dtype=np.int64),
+            "history_dates": history_dates.build(),
+            "history_fatalities": _compact_numbers(
+                np.frombuffer(history_fatalities, dtype=np.float64)
+            ),
+            "region": region_column,
+            "region_offsets": np.frombuffer(region_offsets, dtype=np.int64),
+            "region_members": np.frombuffer(region_members, dtype=np.int32),
+            "omitted_fields": list(omitted_fields),
+        }
+    )
@@ -0,0 +1,75 @@
+"""
+Gunicorn settings, picked up from the working directory by `gunicorn app:server`.
+
+Worker count and bind address use gunicorn's own defaults and environment
+variables (WEB_CONCURRENCY, PORT); the FAST_* variables in config.py
+control the app itself.
+
+Workers are threaded (gthread) by default: each worker process serves
+FAST_WORKER_THREADS requests at once, so a slow client ties up one thread
+rather than a whole process. Callbacks mostly serve cached figures and
+release the GIL while sending, so a few processes with several threads
+each absorb far more concurrent connections than the same number of sync
+workers. The loader, its shard cache and the figure caches are shared by a
+worker's threads and are thread-safe.
+
+Tuning:
+    WEB_CONCURRENCY       worker processes; about one per CPU core
+    FAST_WORKER_THREADS   threads per worker (default 8); raise for many
+                          slow clients, lower if callbacks are CPU-bound
+                          (uncached figures), since threads share one GIL
+    FAST_WORKER_CLASS     "sync" restores gunicorn's one-request-per-process
+                          workers (FAST_WORKER_THREADS is then ignored).
+                          Greenlet workers (gevent, eventlet) are not
+                          supported: preloading imports the app before
+                          they could monkey-patch it.
+
+With FAST_PRELOAD on (the default) the app and forecast data are loaded
+once in the master before workers fork. Workers then start without any
+first-hit load and share the data pages copy-on-write. The store and the
+loader's indexes are NumPy buffers (or the memory-mapped snapshot), which
+reference counting never touches. Forecast dicts are views created per
+lookup, so only per-period and per-country tables are Python objects. The
+garbage collector is frozen after loading so collections in workers don't
+dirty those inherited objects either.
+"""
+import gc
+
+# Not `config`: gunicorn would read that name as its own setting
+import config as fast_config
+
+preload_app = fast_config.PRELOAD_DATA
+worker_class = fast_config.WORKER_CLASS
+# Gunicorn turns "sync" into gthread whenever threads > 1
+threads = 1 if fast_config.WORKER_CLASS == "sync" else fast_config.WORKER_THREADS
+
+
+def when_ready(server):
+    if not fast_config.PRELOAD_DATA:
+        return
+    import data_loader
+
+    loader = data_loader.preload()
+    server.log.info(
+        "Preloaded forecast data %s from %s", loader.version[:12], loader.loaded_from
+    )
+    if fast_config.WARMUP_ENABLED:
+        import warmup
+
+        # Workers fork with these caches already filled
+        stats = warmup.warm_caches(loader)
+        server.log.info(
+            "Warmed %d maps, %d charts, %d pages in %.1fs",
+            stats["maps"], stats["charts"], stats["pages"], stats["seconds"],
+        )
+    # Move everything allocated so far out of the collector's reach so
+    # workers never write to these pages during a collection
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if fast_config.PRELOAD_DATA:
+        import data_loader
+
+        data_loader.start_reloader()
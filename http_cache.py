@@ -0,0 +1,92 @@
+"""
+HTTP caching for Dash responses that depend only on their inputs and the
+data release.
+
+Callback requests (POST /_dash-update-component) whose output is listed in
+CACHEABLE_OUTPUTS get an ETag derived from the data version and the
+callback inputs, plus Cache-Control. A request carrying a matching
+If-None-Match is answered 304 before the callback runs. The ETag is known
+before any work is done, so a reverse proxy or CDN configured to key on the
+POST body can serve repeats without reaching Python at all.
+
+The static Dash layout and dependency routes get content ETags so browsers
+revalidate them cheaply.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from flask import Flask, Response, g, request
+
+import config
+from data_loader import get_loader
+
+CALLBACK_PATH = "/_dash-update-component"
+# Callback outputs whose response is a pure function of inputs + data version
+CACHEABLE_OUTPUTS = frozenset(
+    {
+        "page-content.children",
+        "main-map.figure",
+        "temporal-chart.figure",
+        "covariate-chart.figure",
+        "symlog-chart.figure",
+    }
+)
+STATIC_PATHS = frozenset({"/_dash-layout", "/_dash-dependencies"})
+
+
+def callback_etag(body: dict, version: str) -> Optional[str]:
+    """ETag for a callback request body, or None if it is not cacheable."""
+    if body.get("output") not in CACHEABLE_OUTPUTS:
+        return None
+    key = json.dumps(
+        [version, body["output"], body.get("inputs"), body.get("state")],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _cache_control(response: Response) -> None:
+    response.cache_control.public = True
+    response.cache_control.max_age = config.HTTP_CACHE_MAX_AGE
+
+
+def init_app(server: Flask) -> None:
+    """Install the ETag / conditional request hooks on `server`."""
+    if not config.HTTP_CACHE_ENABLED:
+        return
+
+    @server.before_request
+    def _check_etag():
+        if request.method != "POST" or request.path != CALLBACK_PATH:
+            return None
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return None
+        version = get_loader().version
+        etag = callback_etag(body, version)
+        if etag is None:
+            return None
+        g.http_cache = (etag, version)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            _cache_control(response)
+            return response
+        return None
+
+    @server.after_request
+    def _set_etag(response):
+        if response.status_code != 200:
+            return response
+        if request.path in STATIC_PATHS and request.method == "GET":
+            response.add_etag()
+            return response.make_conditional(request)
+
+        cached = g.pop("http_cache", None)
+        # Skip if a data reload swapped the release while this request ran
+        if cached is not None and cached[1] == get_loader().version:
+            response.set_etag(cached[0])
+            _cache_control(response)
+        return response
@@ -0,0 +1,127 @@
+"""
+Incremental reader for forecast_data.json.
+
+Walks the top-level object and decodes the `forecasts` array one element
+at a time from a sliding text buffer, so peak memory is one chunk plus one
+record rather than the whole file and its parsed tree. Each element is
+decoded by the stdlib C scanner (JSONDecoder.raw_decode).
+"""
+import codecs
+import json
+from typing import BinaryIO, Dict, Iterator
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a number
+_NUMBER_TAIL = "0123456789.eE+-"
+
+
+class _Reader:
+    def __init__(self, f: BinaryIO, digest=None):
+        self._file = f
+        self._digest = digest
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at end of file."""
+        if self.eof:
+            return False
+        data = self._file.read(CHUNK_SIZE)
+        if self._digest is not None:
+            self._digest.update(data)
+        if not data:
+            self.eof = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(data)
+        self.buf = self.buf[self.pos :] + text
+        self.pos = 0
+        return bool(data)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending at the buffer end, or before a "." or exponent,
+            # may be a number cut off by the chunk boundary
+            if self.eof or (end < len(self.buf) and self.buf[end] not in _NUMBER_TAIL):
+                self.pos = end
+                return value
+            self._fill()
+
+    def drain(self) -> None:
+        """Read the rest of the file (so the digest covers all of it)."""
+        while self._fill():
+            self.pos = len(self.buf)
+
+
+def iter_forecasts(
+    f: BinaryIO,
+    top_level: Dict,
+    key: str = "forecasts",
+    digest=None,
+) -> Iterator[Dict]:
+    """
+    Yield the elements of the top-level `key` array of the JSON object in
+    binary file `f`, one at a time. Every other top-level key is decoded
+    whole and stored in `top_level` (available once the generator is
+    exhausted). If `digest` (a hashlib object) is given it is updated with
+    every byte of the file.
+    """
+    reader = _Reader(f, digest)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        reader.drain()
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                        continue
+                    reader.expect("]")
+                    break
+        else:
+            top_level[name] = reader.value()
+
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        break
+    reader.drain()
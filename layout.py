@@ -1,39 +1,31 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from dash import html, dcc
-import plotly.graph_objects as go
-import math
+import numpy as np
+import plotly.colors
 
-from data_loader import get_loader
+from cache import LRUCache
+import config
+from data_loader import add_reload_listener, get_loader
+from figures import figure, get_month_name, quantize
+import metrics
 import temporal_viz
 import covariate_viz
 import symlog_viz
+import comparison_viz
 
 
-def get_month_name(month: int) -> str:
-    month_map = {
-        1: "January",
-        2: "February",
-        3: "March",
-        4: "April",
-        5: "May",
-        6: "June",
-        7: "July",
-        8: "August",
-        9: "September",
-        10: "October",
-        11: "November",
-        12: "December",
-    }
-    return month_map.get(month, str(month))
+# Python Plotly's "Reds"; plotly.js has its own scale under that name
+MAP_COLORSCALE = plotly.colors.make_colorscale(plotly.colors.sequential.Reds)
 
 
+@metrics.timed("layout.create_map_figure")
 def create_map_figure(
     forecasts_by_country: Dict[str, Dict],
     scale_mode: str = "absolute",
-) -> go.Figure:
+) -> Dict:
     """
-    Build the main choropleth map for a given set of forecasts.
+    Build the main choropleth map for a given set of forecasts, as figure JSON.
     forecasts_by_country: dict[country_code] -> forecast dict.
     scale_mode: 'absolute' or 'log'.
     """
@@ -47,49 +39,111 @@ def create_map_figure(
         pf = forecast.get("forecast", {}).get("predicted_fatalities", 0.0) or 0.0
         predicted_fatalities.append(pf)
 
+    # Rounded as in get_map_period_data, so the clientside map matches
+    predicted = np.round(np.asarray(predicted_fatalities, dtype=float), 2)
     if scale_mode == "log":
         # log1p so zero stays at 0
-        z_values = [math.log1p(v) if v > 0 else 0 for v in predicted_fatalities]
+        z_values = quantize(np.log1p(np.maximum(predicted, 0)), 4)
         colorbar_title = "log(1 + predicted fatalities)"
     else:
-        z_values = predicted_fatalities
+        z_values = quantize(predicted)
         colorbar_title = "Predicted fatalities"
 
-    fig = go.Figure(
-        go.Choropleth(
-            locations=country_codes,
-            z=z_values,
-            text=country_names,
-            locationmode="ISO-3",
-            colorscale="Reds",
-            autocolorscale=False,
-            marker_line_color="darkgray",
-            marker_line_width=0.5,
-            colorbar=dict(title=colorbar_title, thickness=12, len=0.6),
-            customdata=predicted_fatalities,
-            hovertemplate=(
-                "<b>%{text}</b><br>"
-                "Predicted fatalities: %{customdata:.1f}"
-                "<extra></extra>"
-            ),
-        )
-    )
+    trace = {
+        "type": "choropleth",
+        "locations": country_codes,
+        "z": z_values,
+        "text": country_names,
+        "locationmode": "ISO-3",
+        "colorscale": MAP_COLORSCALE,
+        "autocolorscale": False,
+        "marker": {"line": {"color": "darkgray", "width": 0.5}},
+        "colorbar": {"title": {"text": colorbar_title}, "thickness": 12, "len": 0.6},
+        "customdata": quantize(predicted),
+        "hovertemplate": (
+            "<b>%{text}</b><br>"
+            "Predicted fatalities: %{customdata:.1f}"
+            "<extra></extra>"
+        ),
+    }
 
     # Simple, stable world view – no manual projection scale so it doesn't jump
-    fig.update_layout(
-    margin=dict(l=0, r=0, t=10, b=0),
-    geo=dict(
-        showframe=False,
-        showcoastlines=True,
-        coastlinecolor="rgba(0,0,0,0.3)",
-        projection_type="natural earth",
-        # Center roughly on Sudan
-        center=dict(lat=12, lon=30),
-        # Zoom level – increase/decrease to taste
-        projection_scale=1.7,
+    return figure(
+        [trace],
+        {
+            "margin": {"l": 0, "r": 0, "t": 10, "b": 0},
+            "geo": {
+                "showframe": False,
+                "showcoastlines": True,
+                "coastlinecolor": "rgba(0,0,0,0.3)",
+                "projection": {
+                    "type": "natural earth",
+                    # Zoom level – increase/decrease to taste
+                    "scale": 1.7,
+                },
+                # Center roughly on Sudan
+                "center": {"lat": 12, "lon": 30},
+            },
+        },
+    )
+
+
+_map_figure_cache = LRUCache(config.MAP_FIGURE_CACHE_SIZE, name="map_figure")
+add_reload_listener(lambda loader: _map_figure_cache.clear())
+
+
+def get_map_figure(loader, month: int, year: int, scale_mode: str = "absolute") -> Dict:
+    """
+    Memoized create_map_figure for one forecast period. Keyed by the
+    loader's data version.
+    """
+    key = (loader.version, month, year, scale_mode)
+    return _map_figure_cache.get_or_create(
+        key,
+        lambda: create_map_figure(
+            loader.get_forecasts_for_period(month, year), scale_mode=scale_mode
         ),
     )
-    return fig
+
+
+def prime_map_figure(loader, month: int, year: int, scale_mode: str, figure: Dict) -> None:
+    """Store a map figure built elsewhere (see warmup.py) under get_map_figure's key."""
+    _map_figure_cache.put((loader.version, month, year, scale_mode), figure)
+
+
+_map_period_data_cache = LRUCache(2, name="map_period_data")
+add_reload_listener(lambda loader: _map_period_data_cache.clear())
+
+
+def get_map_period_data(loader) -> Dict:
+    """
+    Compact map data for every period, shipped once to the browser so the
+    clientside callback can switch period and scale without the server:
+    {"codes": [...], "names": [...], "periods": {"M-YYYY": [value|None, ...]}}
+    Codes and names are shared; each period holds predicted fatalities
+    aligned to them, None where the country has no forecast.
+    """
+
+    def build() -> Dict:
+        # Read straight off the store's columns and period grid
+        store = loader.store
+        codes = loader.get_all_countries()
+        ids = [loader.country_ids[code] for code in codes]
+        names = [store.country_names[idx] for idx in ids]
+        _, grid = store.period_grid()
+        rows = grid[:, ids]
+        predicted = np.nan_to_num(store.predicted[rows])
+        periods = {}
+        for (year, month), period_rows, period_values in zip(
+            loader.periods, rows.tolist(), predicted.tolist()
+        ):
+            periods[f"{month}-{year}"] = [
+                round(value, 2) if row >= 0 else None
+                for row, value in zip(period_rows, period_values)
+            ]
+        return {"codes": codes, "names": names, "periods": periods}
+
+    return _map_period_data_cache.get_or_create(loader.version, build)
 
 
 def create_landing_page():
@@ -109,14 +163,13 @@ def create_landing_page():
             }
             for p in periods
         ]
-        forecasts_for_period = loader.get_forecasts_for_period(default_month, default_year)
+        fig = get_map_figure(loader, default_month, default_year, scale_mode="absolute")
     else:
         # Fallback to "latest" behaviour if something is odd with metadata
         period_value = None
         period_options = []
         forecasts_for_period = loader.get_latest_forecast_for_map()
-
-    fig = create_map_figure(forecasts_for_period, scale_mode="absolute")
+        fig = create_map_figure(forecasts_for_period, scale_mode="absolute")
 
     return html.Div(
         [
@@ -130,6 +183,12 @@ def create_landing_page():
             ),
             html.P(
                 [
+                    html.A(
+                        "Compare countries",
+                        href="/compare",
+                        style={"fontSize": "12px", "color": "#999"},
+                    ),
+                    html.Span(" · ", style={"fontSize": "12px", "color": "#999"}),
                     html.A(
                         "Feature Requests",
                         href=(
@@ -230,12 +289,76 @@ def create_landing_page():
                 figure=fig,
                 style={"height": "800px"},
             ),
+            dcc.Store(
+                id="map-period-data",
+                data=get_map_period_data(loader) if config.CLIENTSIDE_MAP else None,
+            ),
         ]
     )
 
 
-def create_detail_page(country_code: str, month: int, year: int):
-    loader = get_loader()
+_detail_page_cache = LRUCache(config.DETAIL_PAGE_CACHE_SIZE, name="detail_page")
+add_reload_listener(lambda loader: _detail_page_cache.clear())
+
+
+def get_detail_page(country_code: str, month: int, year: int, loader=None):
+    """
+    Cached create_detail_page. The rendered component tree depends only on
+    the data, so it is keyed by (country, month, year, data version) and
+    shared between requests.
+    """
+    if loader is None:
+        loader = get_loader()
+    key = (country_code, month, year, loader.version)
+    return _detail_page_cache.get_or_create(
+        key, lambda: create_detail_page(country_code, month, year, loader)
+    )
+
+
+# chart name -> builder(forecast, loader); each fills the "{name}-chart" graph
+DETAIL_CHARTS = {
+    "temporal": lambda forecast, loader: temporal_viz.create_temporal_chart(forecast, loader),
+    "covariate": lambda forecast, loader: covariate_viz.create_covariate_chart(forecast),
+    "symlog": lambda forecast, loader: symlog_viz.create_symlog_chart(forecast, loader),
+}
+
+_detail_chart_cache = LRUCache(config.DETAIL_CHART_CACHE_SIZE, name="detail_chart")
+add_reload_listener(lambda loader: _detail_chart_cache.clear())
+
+
+def get_detail_chart(
+    chart: str, country_code: str, month: int, year: int, loader=None
+) -> Optional[Dict]:
+    """
+    Figure JSON for one detail-page chart panel, or None if there is no
+    forecast for the country-month. Cached per data version.
+    """
+    if loader is None:
+        loader = get_loader()
+    forecast = loader.get_forecast(country_code, month, year)
+    if forecast is None:
+        return None
+    key = (chart, country_code, month, year, loader.version)
+    return _detail_chart_cache.get_or_create(
+        key, lambda: DETAIL_CHARTS[chart](forecast, loader)
+    )
+
+
+def prime_detail_chart(
+    loader, chart: str, country_code: str, month: int, year: int, figure: Dict
+) -> None:
+    """Store a chart built elsewhere (see warmup.py) under get_detail_chart's key."""
+    _detail_chart_cache.put((chart, country_code, month, year, loader.version), figure)
+
+
+@metrics.timed("layout.create_detail_page")
+def create_detail_page(country_code: str, month: int, year: int, loader=None):
+    """
+    Detail page skeleton: header, month dropdown and summary are rendered
+    here; the chart panels load through their own callbacks.
+    """
+    if loader is None:
+        loader = get_loader()
     # IMPORTANT: (country, month, year) – keep this order
     forecast = loader.get_forecast(country_code, month, year)
 
@@ -272,12 +395,14 @@ def create_detail_page(country_code: str, month: int, year: int):
 
     current_value = f"{month}-{year}"
 
-    temporal_fig = temporal_viz.create_temporal_chart(forecast)
-    covariate_fig = covariate_viz.create_covariate_chart(forecast)
-    symlog_fig = symlog_viz.create_symlog_chart(forecast)
-
+    # Charts are filled in afterwards by one callback per panel
+    # (see callbacks.update_*_chart), keyed off this store
     return html.Div(
         [
+            dcc.Store(
+                id="detail-context",
+                data={"country_code": country_code, "month": month, "year": year},
+            ),
             html.Div(
                 [
                     html.A(
@@ -334,10 +459,12 @@ def create_detail_page(country_code: str, month: int, year: int):
                     html.Div(
                         [
                             html.H3("Historical conflict trends"),
-                            dcc.Graph(
-                                figure=temporal_fig,
-                                config={"displayModeBar": False},
-                                style={"height": "300px"},
+                            dcc.Loading(
+                                dcc.Graph(
+                                    id="temporal-chart",
+                                    config={"displayModeBar": False},
+                                    style={"height": "300px"},
+                                ),
                             ),
                         ],
                         style={
@@ -360,10 +487,12 @@ def create_detail_page(country_code: str, month: int, year: int):
                     html.Div(
                         [
                             html.H3("Structural risk factors"),
-                            dcc.Graph(
-                                figure=covariate_fig,
-                                config={"displayModeBar": False},
-                                style={"height": "300px"},
+                            dcc.Loading(
+                                dcc.Graph(
+                                    id="covariate-chart",
+                                    config={"displayModeBar": False},
+                                    style={"height": "300px"},
+                                ),
                             ),
                         ],
                         style={
@@ -375,10 +504,12 @@ def create_detail_page(country_code: str, month: int, year: int):
                     html.Div(
                         [
                             html.H3("Comparable cases"),
-                            dcc.Graph(
-                                figure=symlog_fig,
-                                config={"displayModeBar": False},
-                                style={"height": "300px"},
+                            dcc.Loading(
+                                dcc.Graph(
+                                    id="symlog-chart",
+                                    config={"displayModeBar": False},
+                                    style={"height": "300px"},
+                                ),
                             ),
                         ],
                         style={
@@ -397,3 +528,160 @@ def create_detail_page(country_code: str, month: int, year: int):
         ],
         style={"padding": "20px"},
     )
+
+
+# Most countries one comparison page shows
+COMPARE_MAX_COUNTRIES = 12
+
+_compare_page_cache = LRUCache(config.COMPARE_PAGE_CACHE_SIZE, name="compare_page")
+add_reload_listener(lambda loader: _compare_page_cache.clear())
+
+
+def get_compare_page(country_codes: List[str], month: Optional[int], year: Optional[int]):
+    """
+    Cached create_compare_page, keyed by the selection and data version.
+    month/year None selects the latest period.
+    """
+    loader = get_loader()
+    key = (tuple(country_codes[:COMPARE_MAX_COUNTRIES]), month, year, loader.version)
+    return _compare_page_cache.get_or_create(
+        key, lambda: create_compare_page(list(key[0]), month, year, loader)
+    )
+
+
+@metrics.timed("layout.create_compare_page")
+def create_compare_page(
+    country_codes: List[str], month: Optional[int], year: Optional[int], loader=None
+):
+    """
+    Side-by-side view of several countries: overlaid fatality series and a
+    probability/fatality scatter for one period, from a single
+    get_forecasts_batch lookup.
+    """
+    if loader is None:
+        loader = get_loader()
+    periods = loader.get_available_periods()
+    if (month, year) not in {(p["month"], p["year"]) for p in periods} and periods:
+        month, year = periods[-1]["month"], periods[-1]["year"]
+
+    batch = loader.get_forecasts_batch(country_codes[:COMPARE_MAX_COUNTRIES])
+    country_names = loader.store.country_names
+    country_options = [
+        {"label": country_names[loader.country_ids[code]], "value": code}
+        for code in loader.get_all_countries()
+    ]
+    period_options = [
+        {
+            "label": f"{get_month_name(p['month'])} {p['year']}",
+            "value": f"{p['month']}-{p['year']}",
+        }
+        for p in periods
+    ]
+
+    if batch["codes"]:
+        body = [
+            html.Div(
+                [
+                    dcc.Graph(
+                        id="compare-temporal-chart",
+                        figure=comparison_viz.create_comparison_temporal_chart(batch, loader),
+                        config={"displayModeBar": False},
+                    ),
+                    dcc.Graph(
+                        id="compare-scatter-chart",
+                        figure=comparison_viz.create_comparison_scatter(batch, month, year),
+                        config={"displayModeBar": False},
+                    ),
+                ],
+                style={
+                    "display": "grid",
+                    "gridTemplateColumns": "3fr 2fr",
+                    "gap": "20px",
+                    "marginBottom": "20px",
+                },
+            ),
+            _compare_table(batch, month, year),
+        ]
+    else:
+        body = [
+            html.P(
+                f"Select up to {COMPARE_MAX_COUNTRIES} countries to compare.",
+                style={"color": "#666"},
+            )
+        ]
+
+    return html.Div(
+        [
+            html.A(
+                "← Back to map",
+                href="/",
+                style={
+                    "fontSize": "14px",
+                    "marginBottom": "10px",
+                    "display": "inline-block",
+                },
+            ),
+            html.H1("Compare countries"),
+            html.Div(
+                [
+                    dcc.Dropdown(
+                        id="compare-countries",
+                        options=country_options,
+                        value=batch["codes"],
+                        multi=True,
+                        placeholder="Select countries",
+                        style={"flex": "1"},
+                    ),
+                    dcc.Dropdown(
+                        id="compare-period",
+                        options=period_options,
+                        value=f"{month}-{year}" if periods else None,
+                        clearable=False,
+                        style={"width": "200px"},
+                    ),
+                ],
+                style={"display": "flex", "gap": "10px", "marginBottom": "20px"},
+            ),
+            *body,
+        ],
+        style={"padding": "20px"},
+    )
+
+
+def _compare_value(value: float, spec: str) -> str:
+    # A forecast may lack either number (NaN in the batch arrays)
+    return "–" if np.isnan(value) else format(value, spec)
+
+
+def _compare_table(batch: Dict, month: int, year: int):
+    """Forecast figures of the compared countries for the selected period."""
+    if (month, year) not in batch["periods"]:
+        return html.Div()
+    j = batch["periods"].index((month, year))
+    cell = {"padding": "4px 12px", "borderBottom": "1px solid #ddd", "textAlign": "left"}
+    rows = []
+    for i, code in enumerate(batch["codes"]):
+        if batch["rows"][i, j] < 0:
+            values = ["–", "–", "No forecast"]
+        else:
+            values = [
+                _compare_value(batch["probability"][i, j], ".3f"),
+                _compare_value(batch["predicted"][i, j], ".1f"),
+                batch["risk_category"][i, j] or "",
+            ]
+        rows.append(
+            html.Tr(
+                [
+                    html.Td(
+                        html.A(batch["names"][i], href=f"/country/{code}/{month}-{year}"),
+                        style=cell,
+                    )
+                ]
+                + [html.Td(value, style=cell) for value in values]
+            )
+        )
+    header = ["Country", "Probability", "Predicted fatalities", "Risk category"]
+    return html.Table(
+        [html.Thead(html.Tr([html.Th(h, style=cell) for h in header])), html.Tbody(rows)],
+        style={"borderCollapse": "collapse", "fontSize": "13px"},
+    )
@@ -0,0 +1,160 @@
+"""
+Lightweight in-process metrics: latency histograms for hot-path functions
+and HTTP requests plus cache hit rates, exposed in Prometheus text format
+on /metrics.
+
+Disabled entirely with FAST_METRICS=0: `timed` then returns the function
+unchanged and no route or request hooks are installed. Each worker process
+keeps its own counters.
+"""
+from bisect import bisect_left
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from flask import Flask, Response, g, request
+
+from cache import all_caches
+import config
+
+# Upper bounds in seconds; a final +Inf bucket is implied
+BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "_lock")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(BUCKETS, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+_function_histograms: Dict[str, Histogram] = {}
+_request_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(registry: Dict[str, Histogram], name: str) -> Histogram:
+    histogram = registry.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = registry.setdefault(name, Histogram())
+    return histogram
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording the wrapped function's latency under `name`."""
+
+    def decorator(fn: Callable) -> Callable:
+        if not config.METRICS_ENABLED:
+            return fn
+        histogram = _histogram(_function_histograms, name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def _label_value(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_histogram(metric: str, label: str, value: str, histogram: Histogram) -> List[str]:
+    counts, total, count = histogram.snapshot()
+    value = _label_value(value)
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(BUCKETS + (float("inf"),), counts):
+        cumulative += bucket_count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{metric}_bucket{{{label}="{value}",le="{le}"}} {cumulative}')
+    lines.append(f'{metric}_sum{{{label}="{value}"}} {total}')
+    lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+    return lines
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = [
+        "# HELP fast_function_duration_seconds Latency of instrumented functions.",
+        "# TYPE fast_function_duration_seconds histogram",
+    ]
+    for name, histogram in sorted(_function_histograms.items()):
+        lines += _format_histogram("fast_function_duration_seconds", "function", name, histogram)
+
+    lines += [
+        "# HELP fast_http_request_duration_seconds Latency of HTTP requests, including serialization.",
+        "# TYPE fast_http_request_duration_seconds histogram",
+    ]
+    for path, histogram in sorted(_request_histograms.items()):
+        lines += _format_histogram("fast_http_request_duration_seconds", "path", path, histogram)
+
+    caches = all_caches()
+    for metric, kind, help_text in (
+        ("fast_cache_hits_total", "counter", "Cache hits."),
+        ("fast_cache_misses_total", "counter", "Cache misses."),
+        ("fast_cache_entries", "gauge", "Entries currently cached."),
+        ("fast_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for cache in caches:
+            stats = cache.stats()
+            lookups = stats["hits"] + stats["misses"]
+            value = {
+                "fast_cache_hits_total": stats["hits"],
+                "fast_cache_misses_total": stats["misses"],
+                "fast_cache_entries": stats["size"],
+                "fast_cache_hit_ratio": stats["hits"] / lookups if lookups else 0.0,
+            }[metric]
+            lines.append(f'{metric}{{cache="{_label_value(cache.name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def init_app(server: Flask) -> None:
+    """Install request timing hooks and the /metrics route on `server`."""
+    if not config.METRICS_ENABLED:
+        return
+
+    @server.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def _record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is not None and request.path != "/metrics":
+            # Label by route pattern, not the raw path: deep links and 404
+            # probes would otherwise each add a series
+            rule = request.url_rule.rule if request.url_rule is not None else "other"
+            _histogram(_request_histograms, rule).observe(time.perf_counter() - start)
+        return response
+
+    @server.route("/metrics")
+    def _metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
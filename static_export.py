@@ -0,0 +1,301 @@
+"""
+Static export of the dashboard for hosting from object storage or a CDN.
+
+Pre-renders every map (each forecast period in both scales) and every
+/country/{CODE}/{M}-{YYYY} detail view of the current data release, using
+the same figure builders as the live app:
+
+    <out>/
+        index.html                          landing page: map with period and
+                                            scale selectors
+        manifest.json                       data version, periods, countries
+        template.json                       the Plotly template of every figure
+        maps/{M}-{YYYY}-{scale}.json        map figure JSON
+        country/{CODE}/{M}-{YYYY}/
+            index.html                      detail page with its charts inline
+            {temporal,covariate,symlog}.json
+                                            chart figure JSON
+
+Figure JSON files leave out layout.template: the template is written once
+to template.json, and each page inlines it once and attaches it to every
+figure it shows.
+
+Links are relative, so the tree can be served from any prefix. Countries
+and periods are rendered in parallel across a process pool; workers load
+the data themselves (or inherit it when forked) and write their files
+directly.
+
+    python static_export.py [-o data/static] [--jobs N] [--plotlyjs cdn|file]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import datetime
+import html
+import json
+import os
+from pathlib import Path
+from string import Template
+import sys
+from typing import Dict, Tuple
+
+import plotly.offline
+from plotly.io.json import to_json_plotly
+
+import data_loader
+from figures import default_template, detach_template
+import layout
+
+SCALE_MODES = ("absolute", "log")
+PLOTLYJS_FILE = "plotly.min.js"
+
+_LANDING_HTML = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>FAST Conflict Forecasts</title>
+<script src="$plotlyjs"></script>
+<style>
+body { font-family: sans-serif; max-width: 1400px; margin: 0 auto; }
+.controls { display: flex; flex-direction: column; align-items: center; gap: 6px; margin: 10px 0; }
+</style>
+</head>
+<body>
+<h1 style="text-align: center; margin-top: 20px">FAST Conflict Forecasts</h1>
+<p style="text-align: center; color: #666">Click on a country to view detailed forecasts</p>
+<div class="controls">
+  <label><b>Forecast period:</b> <select id="period">$period_options</select></label>
+  <div><b>Fatality scale:</b>
+    <label><input type="radio" name="scale" value="absolute" checked> Absolute</label>
+    <label><input type="radio" name="scale" value="log"> Log</label>
+  </div>
+</div>
+<div id="map" style="height: 800px"></div>
+<script>
+const period = document.getElementById("period");
+function scale() { return document.querySelector("input[name=scale]:checked").value; }
+const template = $template;
+function show(figure) {
+  Plotly.react("map", figure.data, Object.assign({template: template}, figure.layout));
+}
+function update() {
+  fetch("maps/" + period.value + "-" + scale() + ".json").then(r => r.json()).then(show);
+}
+period.addEventListener("change", update);
+document.querySelectorAll("input[name=scale]").forEach(el => el.addEventListener("change", update));
+show($figure);
+document.getElementById("map").on("plotly_click", function (event) {
+  window.location.href = "country/" + event.points[0].location + "/" + period.value + "/";
+});
+</script>
+</body>
+</html>
+"""
+)
+
+_DETAIL_HTML = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title - FAST Conflict Forecasts</title>
+<script src="$plotlyjs"></script>
+<style>
+body { font-family: sans-serif; max-width: 1400px; margin: 0 auto; padding: 20px; }
+.row { display: grid; gap: 20px; margin-bottom: 20px; }
+.panel { border: 1px solid #ddd; padding: 15px; height: 350px; }
+.chart { height: 300px; }
+</style>
+</head>
+<body>
+<a href="$root" style="font-size: 14px">&larr; Back to map</a>
+<div style="margin: 10px 0 20px">
+  <h1 style="display: inline-block; margin-right: 20px">$title</h1>
+  <select onchange="window.location.href = '../' + this.value + '/'">$month_options</select>
+</div>
+<div class="row" style="grid-template-columns: 1.2fr 2fr">
+  <div class="panel" style="overflow-y: auto">
+    <h3 style="margin-top: 0; margin-bottom: 10px">Summary</h3>
+    <p style="font-size: 13px; line-height: 1.5">$bluf</p>
+  </div>
+  <div class="panel"><h3>Historical conflict trends</h3><div class="chart" id="temporal-chart"></div></div>
+</div>
+<div class="row" style="grid-template-columns: 1fr 1fr">
+  <div class="panel"><h3>Structural risk factors</h3><div class="chart" id="covariate-chart"></div></div>
+  <div class="panel"><h3>Comparable cases</h3><div class="chart" id="symlog-chart"></div></div>
+</div>
+<script>
+const template = $template;
+const figures = $figures;
+for (const [chart, figure] of Object.entries(figures)) {
+  const layout = Object.assign({template: template}, figure.layout);
+  Plotly.newPlot(chart + "-chart", figure.data, layout, {displayModeBar: false});
+}
+</script>
+</body>
+</html>
+"""
+)
+
+_out_dir: Path = Path()
+_plotlyjs = ""
+
+
+def _script_json(value) -> str:
+    """JSON for embedding in a <script> element."""
+    return to_json_plotly(value).replace("</", "<\\/")
+
+
+def _write(path: Path, text: str) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = text.encode("utf-8")
+    path.write_bytes(data)
+    return len(data)
+
+
+def _init_worker(out_dir: Path, plotlyjs: str) -> None:
+    global _out_dir, _plotlyjs
+    _out_dir = out_dir
+    _plotlyjs = plotlyjs
+    data_loader.preload()
+
+
+def export_period(month: int, year: int) -> Tuple[int, int]:
+    """Write the map figures for one period; returns (files, bytes)."""
+    loader = data_loader.preload()
+    written = 0
+    for scale_mode in SCALE_MODES:
+        figure = detach_template(layout.get_map_figure(loader, month, year, scale_mode))
+        written += _write(
+            _out_dir / "maps" / f"{month}-{year}-{scale_mode}.json", to_json_plotly(figure)
+        )
+    return len(SCALE_MODES), written
+
+
+def export_country(country_code: str) -> Tuple[int, int]:
+    """Write every detail view of one country; returns (files, bytes)."""
+    loader = data_loader.preload()
+    forecasts = loader.get_country_forecasts(country_code)
+    month_options = [
+        (f"{f['month']}-{f['year']}", f"{layout.get_month_name(f['month'])} {f['year']}")
+        for f in forecasts
+    ]
+    files = written = 0
+    for forecast in forecasts:
+        month, year = forecast["month"], forecast["year"]
+        view_dir = _out_dir / "country" / country_code / f"{month}-{year}"
+        # Shards hold the full record; summary rows lack history and covariates
+        forecast = loader.get_forecast(country_code, month, year)
+        figures = {}
+        for chart, build in layout.DETAIL_CHARTS.items():
+            figures[chart] = detach_template(build(forecast, loader))
+            written += _write(view_dir / f"{chart}.json", to_json_plotly(figures[chart]))
+
+        current = f"{month}-{year}"
+        page = _DETAIL_HTML.substitute(
+            title=html.escape(f"{forecast['country_name']}, {layout.get_month_name(month)} {year}"),
+            plotlyjs=html.escape(_plotlyjs.format(root="../../../")),
+            root="../../../",
+            month_options="".join(
+                f'<option value="{value}"{" selected" if value == current else ""}>{html.escape(label)}</option>'
+                for value, label in month_options
+            ),
+            bluf=html.escape(forecast.get("bluf", "") or ""),
+            template=_script_json(default_template()),
+            figures=_script_json(figures),
+        )
+        written += _write(view_dir / "index.html", page)
+        files += len(figures) + 1
+    return files, written
+
+
+def _export_landing(loader, out_dir: Path, plotlyjs: str) -> int:
+    periods = loader.get_available_periods()
+    default = periods[-1]
+    figure = detach_template(
+        layout.get_map_figure(loader, default["month"], default["year"], "absolute")
+    )
+    options = "".join(
+        '<option value="{value}"{selected}>{label}</option>'.format(
+            value=f"{p['month']}-{p['year']}",
+            selected=" selected" if p is default else "",
+            label=html.escape(f"{layout.get_month_name(p['month'])} {p['year']}"),
+        )
+        for p in periods
+    )
+    page = _LANDING_HTML.substitute(
+        plotlyjs=html.escape(plotlyjs.format(root="")),
+        period_options=options,
+        template=_script_json(default_template()),
+        figure=_script_json(figure),
+    )
+    manifest = {
+        "version": loader.version,
+        "generated": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "metadata": loader.get_metadata(),
+        "periods": [f"{p['month']}-{p['year']}" for p in periods],
+        "countries": loader.get_all_countries(),
+        "scale_modes": list(SCALE_MODES),
+        "template": "template.json",
+    }
+    return (
+        _write(out_dir / "index.html", page)
+        + _write(out_dir / "manifest.json", json.dumps(manifest, indent=2))
+        + _write(out_dir / "template.json", to_json_plotly(default_template()))
+    )
+
+
+def export_site(out_dir: Path, jobs: int = 0, plotlyjs: str = "cdn") -> Dict[str, int]:
+    """
+    Export the whole dashboard for the current data release to `out_dir`.
+    `plotlyjs` is "cdn" to load plotly.js from cdn.plot.ly or "file" to
+    write it next to the pages. Returns file and byte counts.
+    """
+    loader = data_loader.preload()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if plotlyjs == "file":
+        _write(out_dir / PLOTLYJS_FILE, plotly.offline.get_plotlyjs())
+        plotlyjs_src = "{root}" + PLOTLYJS_FILE
+    else:
+        plotlyjs_src = f"https://cdn.plot.ly/plotly-{plotly.offline.get_plotlyjs_version()}.min.js"
+
+    periods = loader.get_available_periods()
+    countries = loader.get_all_countries()
+    if not periods:
+        raise ValueError("No forecast periods to export")
+
+    totals = {"files": 3, "bytes": _export_landing(loader, out_dir, plotlyjs_src)}
+    with ProcessPoolExecutor(
+        max_workers=jobs or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(out_dir, plotlyjs_src),
+    ) as pool:
+        tasks = [pool.submit(export_period, p["month"], p["year"]) for p in periods]
+        tasks += [pool.submit(export_country, code) for code in countries]
+        for done, task in enumerate(as_completed(tasks), 1):
+            files, written = task.result()
+            totals["files"] += files
+            totals["bytes"] += written
+            if done % 50 == 0 or done == len(tasks):
+                print(f"  {done}/{len(tasks)} tasks, {totals['files']} files", file=sys.stderr)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the dashboard as static figure JSON and HTML.")
+    parser.add_argument("-o", "--output", default="data/static", help="output directory")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        "--plotlyjs",
+        choices=("cdn", "file"),
+        default="cdn",
+        help="load plotly.js from cdn.plot.ly or write a local copy",
+    )
+    args = parser.parse_args()
+
+    totals = export_site(Path(args.output), args.jobs, args.plotlyjs)
+    print(f"Wrote {totals['files']} files ({totals['bytes'] / 1e6:.1f} MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
-import plotly.graph_objects as go
 from typing import Dict
 import numpy as np
 
-def create_symlog_chart(forecast: Dict) -> go.Figure:
-    regional_context = forecast['regional_context']
-    country_code = forecast['country_code']
+from figures import figure, get_month_name, hline, quantize, vline
+import metrics
+
+@metrics.timed("symlog_viz.create_symlog_chart")
+def create_symlog_chart(forecast: Dict, loader=None) -> Dict:
     country_name = forecast['country_name']
     month = forecast['month']
     year = forecast['year']
-    cohort = forecast['cohort']
     
     color_map = {
         "Near-certain no conflict": "#ADD8E6",
@@ -17,76 +17,60 @@ def create_symlog_chart(forecast: Dict) -> go.Figure:
         "Near-certain conflict": "#FF0000"
     }
     
-    from data_loader import get_loader
-    loader = get_loader()
+    if loader is None:
+        from data_loader import get_loader
+        loader = get_loader()
     
-    all_countries_data = []
-    for country in regional_context:
-        country_forecast = loader.get_forecast(country['country_code'], month, year)
-        if country_forecast:
-            risk_cat = country_forecast['forecast']['risk_category']
-            all_countries_data.append({
-                'code': country['country_code'],
-                'name': country['country_name'],
-                'prob': country['probability'],
-                'predicted': country['predicted_fatalities'],
-                'risk_category': risk_cat,
-                'color': color_map.get(risk_cat, '#CCCCCC')
-            })
+    regional = loader.get_regional_comparison(forecast)
     
-    fig = go.Figure()
+    traces = []
     
     for category, color in color_map.items():
-        category_data = [d for d in all_countries_data if d['risk_category'] == category]
-        if category_data:
-            fig.add_trace(go.Scatter(
-                x=[d['prob'] for d in category_data],
-                y=[d['predicted'] for d in category_data],
-                mode='markers',
-                name=category,
-                marker=dict(size=8, color=color, opacity=0.7, line=dict(color='gray', width=0.5)),
-                text=[d['name'] for d in category_data],
-                hovertemplate='%{text}<br>Probability: %{x:.3f}<br>Predicted: %{y:.1f}<extra></extra>'
-            ))
-    
-    target_data = [d for d in all_countries_data if d['code'] == country_code]
-    if target_data:
-        target = target_data[0]
-        fig.add_trace(go.Scatter(
-            x=[target['prob']],
-            y=[target['predicted']],
-            mode='markers',
-            name=f'{country_name} (target)',
-            marker=dict(size=15, color='darkred', symbol='diamond', 
-                       line=dict(color='black', width=2)),
-            text=[country_name],
-            hovertemplate='%{text}<br>Probability: %{x:.3f}<br>Predicted: %{y:.1f}<extra></extra>'
-        ))
+        mask = regional['risk_category'] == category
+        if mask.any():
+            traces.append({
+                'type': 'scatter',
+                'x': quantize(regional['probability'][mask], 4),
+                'y': quantize(regional['predicted'][mask]),
+                'mode': 'markers',
+                'name': category,
+                'marker': {'size': 8, 'color': color, 'opacity': 0.7, 'line': {'color': 'gray', 'width': 0.5}},
+                'text': regional['names'][mask].tolist(),
+                'hovertemplate': '%{text}<br>Probability: %{x:.3f}<br>Predicted: %{y:.1f}<extra></extra>'
+            })
     
-    fig.add_vline(x=0.01, line_dash="dash", line_color="blue", opacity=0.7, line_width=1)
-    fig.add_vline(x=0.50, line_dash="dash", line_color="blue", opacity=0.7, line_width=1)
-    fig.add_vline(x=0.99, line_dash="dash", line_color="blue", opacity=0.7, line_width=1)
+    target_idx = np.flatnonzero(regional['is_target'])
+    if len(target_idx):
+        target = target_idx[0]
+        traces.append({
+            'type': 'scatter',
+            'x': quantize(regional['probability'][target:target + 1], 4),
+            'y': quantize(regional['predicted'][target:target + 1]),
+            'mode': 'markers',
+            'name': f'{country_name} (target)',
+            'marker': {'size': 15, 'color': 'darkred', 'symbol': 'diamond', 
+                       'line': {'color': 'black', 'width': 2}},
+            'text': [country_name],
+            'hovertemplate': '%{text}<br>Probability: %{x:.3f}<br>Predicted: %{y:.1f}<extra></extra>'
+        })
     
-    fig.add_hline(y=10, line_dash="dash", line_color="green", opacity=0.7, line_width=1)
-    fig.add_hline(y=100, line_dash="dash", line_color="green", opacity=0.7, line_width=1)
-    fig.add_hline(y=1000, line_dash="dash", line_color="green", opacity=0.7, line_width=1)
+    threshold_line = {'dash': 'dash', 'width': 1, 'opacity': 0.7}
+    shapes = [vline(x, color='blue', **threshold_line) for x in (0.01, 0.50, 0.99)]
+    shapes += [hline(y, color='green', **threshold_line) for y in (10, 100, 1000)]
     
     y_min = 0
-    y_max = max([d['predicted'] for d in all_countries_data]) * 1.1 if all_countries_data else 1000
-    
-    fig.update_layout(
-        title=f'Regional Conflict Forecast Distribution - {get_month_name(month)} {year}',
-        xaxis_title='Probability of ≥25 Fatalities',
-        yaxis_title='Predicted Fatalities',
-        height=350,
-        margin=dict(l=40, r=20, t=40, b=40),
-        xaxis=dict(range=[-0.05, 1.05]),
-        yaxis=dict(type='linear', range=[y_min, y_max]),
-        legend=dict(orientation='v', yanchor='top', y=1, xanchor='left', x=1.02),
-        hovermode='closest'
-    )
+    # A neighbour's forecast may lack predicted fatalities (NaN)
+    predicted = regional['predicted']
+    y_max = float(np.nanmax(predicted)) if not np.isnan(predicted).all() else np.nan
+    y_max = round(y_max * 1.1, 2) if np.isfinite(y_max) else 1000
     
-    return fig
-
-def get_month_name(month: int) -> str:
-    return {12: "December", 3: "March", 9: "September"}.get(month, str(month))
\ No newline at end of file
+    return figure(traces, {
+        'title': {'text': f'Regional Conflict Forecast Distribution - {get_month_name(month)} {year}'},
+        'height': 350,
+        'margin': {'l': 40, 'r': 20, 't': 40, 'b': 40},
+        'xaxis': {'title': {'text': 'Probability of ≥25 Fatalities'}, 'range': [-0.05, 1.05]},
+        'yaxis': {'title': {'text': 'Predicted Fatalities'}, 'type': 'linear', 'range': [y_min, y_max]},
+        'legend': {'orientation': 'v', 'yanchor': 'top', 'y': 1, 'xanchor': 'left', 'x': 1.02},
+        'hovermode': 'closest',
+        'shapes': shapes
+    })
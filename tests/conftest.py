@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+import sys
+from typing import Dict, List
+
+import pytest
+
+# The app modules live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+COUNTRIES = [
+    ("CIV", "Côte d’Ivoire", "West Africa"),
+    ("JPN", "日本", None),
+    ("TUR", "Türkiye", "Europe"),
+]
+PERIODS = [(2025, 12), (2026, 1), (2026, 2)]
+
+
+def _values(idx: int, month: int) -> Dict:
+    return {
+        "probability": round(0.1 * (idx + 1) + 0.01 * month, 3),
+        "predicted_fatalities": 12.5 * (idx + 1) + month,
+    }
+
+
+def make_forecasts() -> List[Dict]:
+    """
+    A few forecasts with non-ASCII text, optional fields and a regional
+    context naming a country without forecasts of its own.
+    """
+    forecasts = []
+    for idx, (code, name, cohort) in enumerate(COUNTRIES):
+        for year, month in PERIODS:
+            regional_context = [
+                {"country_code": other, "country_name": other_name, **_values(i, month)}
+                for i, (other, other_name, _) in enumerate(COUNTRIES)
+            ]
+            regional_context.append({"country_code": "GHA", "country_name": "Ghana"})
+            forecast = {
+                "country_code": code,
+                "country_name": name,
+                "month": month,
+                "year": year,
+                "forecast": {**_values(idx, month), "risk_category": "Improbable conflict"},
+                "historical": {
+                    "monthly_data": [
+                        {"date": f"2025-{m:02d}", "fatalities": idx * 10 + m} for m in range(1, 12)
+                    ]
+                },
+                "covariates": {"infant_mortality": 40.5 + idx, "military_power": 1.5 * idx},
+                "regional_context": regional_context,
+                "bluf": f"{name}: risque modéré ⚠️ pour {month}/{year}.",
+            }
+            if cohort is not None:
+                forecast["cohort"] = cohort
+            forecasts.append(forecast)
+    return forecasts
+
+
+@pytest.fixture
+def forecast_data() -> Dict:
+    return {
+        "metadata": {"generated": "2025-11-30", "source": "Prévisions"},
+        "forecasts": make_forecasts(),
+        "version": 2,
+    }
+
+
+@pytest.fixture
+def forecast_file(tmp_path, forecast_data) -> Path:
+    path = tmp_path / "forecast_data.json"
+    path.write_text(json.dumps(forecast_data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def loader(tmp_path, forecast_file, monkeypatch):
+    """A loader for forecast_file, installed as the app's current loader."""
+    import data_loader
+
+    loader = data_loader.ForecastDataLoader(str(forecast_file), str(tmp_path / "none.snapshot"))
+    monkeypatch.setattr(data_loader, "_loader", loader)
+    return loader
+
+
+@pytest.fixture
+def client(loader):
+    """Test client for the Dash app's Flask server, serving `loader`."""
+    from app import server
+
+    return server.test_client()
@@ -0,0 +1,207 @@
+import csv
+import io
+import json
+
+import pytest
+
+import api
+from benchmarks.synthetic_data import write_synthetic_data
+from data_loader import ForecastDataLoader
+import data_loader
+import forecast_shards
+
+# More rows than one CSV flush (256) and one default page
+COUNTRIES = 110
+PERIODS = 3
+
+
+@pytest.fixture(scope="module")
+def data_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("api") / "forecast_data.json"
+    write_synthetic_data(str(path), countries=COUNTRIES, periods=PERIODS, history_months=6)
+    return path
+
+
+@pytest.fixture(params=["json", "shards"])
+def api_loader(request, data_file, tmp_path, monkeypatch):
+    if request.param == "shards":
+        path = forecast_shards.build_shards(data_file, tmp_path / "shards")
+    else:
+        path = data_file
+    loader = ForecastDataLoader(str(path), str(tmp_path / "none.snapshot"))
+    monkeypatch.setattr(data_loader, "_loader", loader)
+    return loader
+
+
+@pytest.fixture
+def api_client(api_loader):
+    from app import server
+
+    return server.test_client()
+
+
+@pytest.fixture(scope="module")
+def source(data_file):
+    with data_file.open(encoding="utf-8") as f:
+        forecasts = json.load(f)["forecasts"]
+    return {(f["country_code"], f["month"], f["year"]): f for f in forecasts}
+
+
+def _key(record):
+    return record["country_code"], record["month"], record["year"]
+
+
+def _pages(client, url, limit):
+    pages = []
+    cursor = None
+    while True:
+        query = f"{url}{'&' if '?' in url else '?'}limit={limit}"
+        if cursor:
+            query += f"&cursor={cursor}"
+        body = client.get(query).get_json()
+        pages.append(body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    version = "ab" * 32
+    for position in (0, 1, 255, 10**9):
+        assert api._decode_cursor(api._encode_cursor(version, position), version) == position
+
+
+def test_pages_disjoint_and_complete(api_client, source):
+    pages = _pages(api_client, "/api/v1/forecasts", limit=97)
+    assert [len(page) for page in pages] == [97, 97, 97, 39]
+
+    keys = [_key(record) for page in pages for record in page]
+    assert len(keys) == len(set(keys)) == len(source)
+    assert set(keys) == set(source)
+    assert keys == sorted(keys, key=lambda k: (k[2], k[1], k[0]))
+
+
+def test_filtered_pages(api_client, source):
+    codes = sorted({code for code, _, _ in source})[:5]
+    url = f"/api/v1/forecasts?country={','.join(codes)}&period=1-2026"
+    keys = [_key(r) for page in _pages(api_client, url, limit=2) for r in page]
+    assert keys == [(code, 1, 2026) for code in codes]
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90LWEtY3Vyc29y", api._encode_cursor("x", 1)[:-2]])
+def test_malformed_cursor(api_client, cursor):
+    response = api_client.get(f"/api/v1/forecasts?cursor={cursor}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_cursor_from_older_release(api_client, api_loader, monkeypatch):
+    cursor = api_client.get("/api/v1/forecasts?limit=10").get_json()["next_cursor"]
+    monkeypatch.setattr(api_loader, "version", "f" * 64)
+
+    response = api_client.get(f"/api/v1/forecasts?limit=10&cursor={cursor}")
+    assert response.status_code == 410
+
+
+def test_default_fields(api_client, source):
+    record = api_client.get("/api/v1/forecasts?limit=1").get_json()["data"][0]
+    assert set(record) == set(api.DEFAULT_FIELDS)
+    forecast = source[_key(record)]
+    assert record["predicted_fatalities"] == forecast["forecast"]["predicted_fatalities"]
+    assert record["cohort"] == forecast["cohort"]
+
+
+def test_field_projection(api_client):
+    record = api_client.get("/api/v1/forecasts?limit=1&fields=year,country_code").get_json()[
+        "data"
+    ][0]
+    assert set(record) == {"year", "country_code"}
+
+
+def test_all_fields_read_shards(api_client, api_loader, source):
+    records = api_client.get("/api/v1/forecasts?limit=3&fields=all").get_json()["data"]
+    for record in records:
+        assert set(record) == set(api.ALL_FIELDS)
+        forecast = source[_key(record)]
+        # historical, covariates and bluf come from the country shard when sharded
+        assert record["historical"] == forecast["historical"]["monthly_data"]
+        assert record["covariates"] == forecast["covariates"]
+        assert record["bluf"] == forecast["bluf"]
+        assert [c["country_code"] for c in record["regional_context"]] == [
+            c["country_code"] for c in forecast["regional_context"]
+        ]
+    if api_loader.shard_dir is not None:
+        # One shard read per country on the page
+        assert len(api_loader._shards) == len({r["country_code"] for r in records}) == 3
+
+
+def test_unknown_fields(api_client):
+    response = api_client.get("/api/v1/forecasts?fields=year,secret,other")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Unknown fields: secret, other"}
+
+
+def test_csv_stream(api_client, source):
+    response = api_client.get(
+        "/api/v1/forecasts?format=csv&limit=5000&fields=country_code,month,year,covariates"
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["X-Total-Count"] == str(len(source))
+    assert "X-Next-Cursor" not in response.headers
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["country_code", "month", "year", "covariates"]
+    assert len(rows) == len(source) + 1
+    for code, month, year, covariates in rows[1:]:
+        forecast = source[(code, int(month), int(year))]
+        assert json.loads(covariates) == forecast["covariates"]
+
+
+def test_ndjson_stream_pages(api_client, source):
+    response = api_client.get("/api/v1/forecasts?format=ndjson&limit=300")
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 300
+    # Unlike jsonify, the streams keep the projection's field order
+    assert list(json.loads(lines[0])) == list(api.DEFAULT_FIELDS)
+
+    cursor = response.headers["X-Next-Cursor"]
+    rest = api_client.get(f"/api/v1/forecasts?format=ndjson&limit=300&cursor={cursor}")
+    assert "X-Next-Cursor" not in rest.headers
+    keys = {_key(json.loads(line)) for line in lines + rest.get_data(as_text=True).splitlines()}
+    assert keys == set(source)
+
+
+@pytest.mark.parametrize("count", [0, 1, 255, 256, 257, 512, 513])
+def test_csv_flushes_every_256_rows(count):
+    records = [{"a": i, "b": {"n": i}} for i in range(count)]
+    chunks = list(api._stream(iter(records), "csv", ["a", "b"]))
+
+    assert len(chunks) == count // 256 + 1
+    assert chunks[0].startswith("a,b\r\n")
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows == [["a", "b"]] + [[str(i), json.dumps({"n": i})] for i in range(count)]
+    for chunk in chunks[:-1]:
+        assert chunk.endswith("\r\n")
+
+
+def test_not_modified(api_client):
+    url = "/api/v1/forecasts?country=AAA"
+    response = api_client.get(url)
+    etag, _ = response.get_etag()
+    assert etag
+
+    assert api_client.get(url, headers={"If-None-Match": f'"{etag}"'}).status_code == 304
+    assert api_client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+    # The ETag covers the query
+    other_query = api_client.get(url + "&limit=1", headers={"If-None-Match": f'"{etag}"'})
+    assert other_query.status_code == 200
+
+
+def test_lookup_errors(api_client):
+    assert api_client.get("/api/v1/countries/ZZZ/forecasts").status_code == 404
+    assert api_client.get("/api/v1/periods/1-1999/forecasts").status_code == 404
+    assert api_client.get("/api/v1/forecasts?period=13").status_code == 400
+    assert api_client.get("/api/v1/forecasts?format=xml").status_code == 400
+    assert api_client.get("/api/v1/forecasts?limit=0").status_code == 400
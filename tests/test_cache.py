@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from cache import LRUCache, all_caches
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(2, name="test_lru")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2, "maxsize": 2}
+    assert cache in all_caches()
+
+
+def test_get_or_create_caches_value():
+    cache = LRUCache(2)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    value = cache.get_or_create("a", factory)
+    assert cache.get_or_create("a", factory) is value
+    assert len(calls) == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = LRUCache(0)
+    assert cache.get_or_create("a", lambda: 1) == 1
+    assert len(cache) == 0
+
+
+def test_get_or_create_builds_each_key_once():
+    cache = LRUCache(8)
+    calls = []
+    start = threading.Barrier(8)
+
+    def factory(key):
+        calls.append(key)
+        time.sleep(0.05)
+        return object()
+
+    results = {}
+
+    def worker(i):
+        key = i % 2
+        start.wait()
+        results[i] = cache.get_or_create(key, lambda: factory(key))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == [0, 1]
+    assert all(results[i] is results[i % 2] for i in range(8))
+    assert cache._building == {}
+
+
+def test_failed_build_is_retried():
+    cache = LRUCache(2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_create("a", fail)
+    assert cache.get_or_create("a", lambda: 1) == 1
+    assert cache._building == {}
@@ -0,0 +1,98 @@
+import gzip
+
+import pytest
+
+import compression
+import config
+
+requires_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+
+CONTEXT = {"country_code": "TUR", "month": 2, "year": 2026}
+
+
+def _symlog_chart(client, encoding, **headers):
+    body = {
+        "output": "symlog-chart.figure",
+        "outputs": {"id": "symlog-chart", "property": "figure"},
+        "inputs": [{"id": "detail-context", "property": "data", "value": CONTEXT}],
+        "changedPropIds": ["detail-context.data"],
+    }
+    headers["Accept-Encoding"] = encoding
+    return client.post("/_dash-update-component", json=body, headers=headers)
+
+
+def _plain(client):
+    return _symlog_chart(client, "identity")
+
+
+@requires_brotli
+def test_brotli_preferred_over_gzip(client):
+    plain = _plain(client)
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.get_data()) >= config.COMPRESSION_MIN_SIZE
+
+    response = _symlog_chart(client, "gzip, deflate, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert "Accept-Encoding" in response.vary
+    assert compression.brotli.decompress(response.get_data()) == plain.get_data()
+
+    response = _symlog_chart(client, "gzip, br;q=0")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+
+
+def test_small_responses_not_compressed(client, monkeypatch):
+    size = len(_plain(client).get_data())
+    monkeypatch.setattr(config, "COMPRESSION_MIN_SIZE", size + 1)
+
+    response = _symlog_chart(client, "gzip, br")
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_data()) == size
+    assert "Accept-Encoding" in response.vary
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_streamed_responses_not_buffered(client, monkeypatch, fmt):
+    monkeypatch.setattr(config, "COMPRESSION_MIN_SIZE", 1)
+    response = client.get(
+        f"/api/v1/forecasts?format={fmt}", headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert "Content-Encoding" not in response.headers
+    assert "Content-Length" not in response.headers
+    assert response.get_data(as_text=True).count("\n") >= 9
+
+    # The same rows as one JSON document are compressed
+    response = client.get("/api/v1/forecasts", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+@requires_brotli
+def test_etag_weakened_and_cache_keyed_per_encoding(client, monkeypatch):
+    etag, weak = _plain(client).get_etag()
+    assert etag and not weak
+
+    calls = []
+    original = compression.compress
+
+    def counting(data, encoding):
+        calls.append(encoding)
+        return original(data, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    compression._compressed_cache.clear()
+
+    bodies = {}
+    for encoding in ("br", "gzip", "br", "gzip"):
+        response = _symlog_chart(client, encoding)
+        assert response.headers["Content-Encoding"] == encoding
+        assert response.get_etag() == (etag, True)
+        bodies.setdefault(encoding, response.get_data())
+        assert response.get_data() == bodies[encoding]
+
+    # Each coding is compressed once and cached under its own key
+    assert calls == ["br", "gzip"]
+    assert compression._compressed_cache.get((etag, "br")) == bodies["br"]
+    assert compression._compressed_cache.get((etag, "gzip")) == bodies["gzip"]
+    assert bodies["br"] != bodies["gzip"]
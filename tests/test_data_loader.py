@@ -0,0 +1,70 @@
+import pytest
+
+from data_loader import ForecastDataLoader
+import forecast_shards
+import forecast_snapshot
+
+
+@pytest.fixture
+def loaders(tmp_path, forecast_file):
+    """One loader per layout, all built from forecast_file."""
+    json_loader = ForecastDataLoader(str(forecast_file), str(tmp_path / "none.snapshot"))
+
+    snapshot_path = forecast_snapshot.build_snapshot(forecast_file)
+    snapshot_loader = ForecastDataLoader(str(forecast_file), str(snapshot_path))
+
+    shard_dir = forecast_shards.build_shards(forecast_file, tmp_path / "shards")
+    shard_loader = ForecastDataLoader(str(shard_dir), str(tmp_path / "none.snapshot"))
+
+    assert [json_loader.loaded_from, snapshot_loader.loaded_from, shard_loader.loaded_from] == [
+        "json",
+        "snapshot",
+        "shards",
+    ]
+    return {"json": json_loader, "snapshot": snapshot_loader, "shards": shard_loader}
+
+
+def test_loaders_return_equal_records(loaders, forecast_data):
+    expected = {
+        (f["country_code"], f["month"], f["year"]): f for f in forecast_data["forecasts"]
+    }
+    for mode, loader in loaders.items():
+        assert loader.version == loaders["json"].version, mode
+        assert loader.metadata == forecast_data["metadata"], mode
+        assert loader.get_available_periods() == loaders["json"].get_available_periods(), mode
+        assert loader.get_all_countries() == ["CIV", "JPN", "TUR"], mode
+        for (code, month, year), forecast in expected.items():
+            record = loader.get_forecast(code, month, year)
+            assert set(record) == set(forecast), (mode, code, month, year)
+            assert {key: record[key] for key in record} == forecast, (mode, code, month, year)
+            assert len(record) == len(forecast)
+
+
+@pytest.mark.parametrize("mode", ["json", "snapshot", "shards"])
+def test_missing_forecasts(loaders, mode):
+    loader = loaders[mode]
+    record = loader.get_forecast("JPN", 12, 2025)
+    assert "cohort" not in record
+    with pytest.raises(KeyError):
+        record["cohort"]
+    assert record.get("cohort") is None
+
+    # GHA only appears in regional contexts
+    assert "GHA" not in loader.country_ids
+    assert loader.get_forecast("GHA", 12, 2025) is None
+    assert loader.get_forecast("CIV", 3, 2026) is None
+    assert loader.get_country_forecasts("GHA") == []
+
+
+def test_summary_views_match(loaders):
+    reference = loaders["json"]
+    for mode, loader in loaders.items():
+        for code in reference.get_all_countries():
+            assert loader.get_forecast_series(code) == reference.get_forecast_series(code), mode
+            assert [
+                (r["country_code"], r["month"], r["year"], r["forecast"])
+                for r in loader.get_country_forecasts(code)
+            ] == [
+                (r["country_code"], r["month"], r["year"], r["forecast"])
+                for r in reference.get_country_forecasts(code)
+            ], mode
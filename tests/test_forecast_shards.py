@@ -0,0 +1,43 @@
+import json
+
+import forecast_shards
+import forecast_snapshot
+
+
+def _countries_dir(shard_dir):
+    header = forecast_snapshot.read_header(forecast_shards.summary_path(shard_dir))
+    return shard_dir / header["source"]["countries_dir"]
+
+
+def test_build_writes_one_shard_per_country(tmp_path, forecast_file):
+    shard_dir = forecast_shards.build_shards(forecast_file, tmp_path / "shards")
+
+    countries = _countries_dir(shard_dir)
+    assert sorted(p.name for p in countries.iterdir()) == ["CIV.ndjson", "JPN.ndjson", "TUR.ndjson"]
+    assert not (shard_dir / "countries.tmp").exists()
+
+
+def test_rebuild_from_same_source_keeps_live_shards(tmp_path, forecast_file):
+    shard_dir = forecast_shards.build_shards(forecast_file, tmp_path / "shards")
+    countries = _countries_dir(shard_dir)
+    inodes = {p.name: p.stat().st_ino for p in countries.iterdir()}
+
+    forecast_shards.build_shards(forecast_file, shard_dir)
+
+    # Same directory and files, never removed in between
+    assert _countries_dir(shard_dir) == countries
+    assert {p.name: p.stat().st_ino for p in countries.iterdir()} == inodes
+    assert not (shard_dir / "countries.tmp").exists()
+
+
+def test_rebuild_keeps_previous_release(tmp_path, forecast_file, forecast_data):
+    shard_dir = forecast_shards.build_shards(forecast_file, tmp_path / "shards")
+    first = _countries_dir(shard_dir)
+
+    forecast_data["metadata"]["generated"] = "2025-12-31"
+    forecast_file.write_text(json.dumps(forecast_data), encoding="utf-8")
+    forecast_shards.build_shards(forecast_file, shard_dir)
+    second = _countries_dir(shard_dir)
+
+    assert second != first
+    assert first.exists() and second.exists()
@@ -0,0 +1,105 @@
+import json
+import os
+import struct
+
+import numpy as np
+import pytest
+
+import forecast_snapshot
+from forecast_store import ForecastRecord, build_store
+
+
+def _columns(store):
+    arrays, tables = store.to_columns()
+    return {name: np.asarray(array) for name, array in arrays.items()}, tables
+
+
+def test_round_trip(tmp_path, forecast_data):
+    metadata = forecast_data["metadata"]
+    store = build_store(forecast_data["forecasts"], {"metadata": metadata})
+    path = tmp_path / "forecast_data.snapshot"
+    source = {"path": "forecast_data.json", "sha256": "0" * 64, "size": 1, "mtime_ns": 2}
+
+    forecast_snapshot.write_snapshot(store, metadata, path, source)
+    loaded, loaded_metadata, header = forecast_snapshot.read_snapshot(path)
+
+    assert loaded_metadata == metadata
+    assert header["source"] == source
+    assert header["schema_version"] == forecast_snapshot.SCHEMA_VERSION
+    assert not path.with_name(path.name + ".tmp").exists()
+
+    arrays, tables = _columns(store)
+    loaded_arrays, loaded_tables = _columns(loaded)
+    assert loaded_tables == tables
+    assert arrays.keys() == loaded_arrays.keys()
+    for name, array in arrays.items():
+        assert loaded_arrays[name].dtype == array.dtype, name
+        np.testing.assert_array_equal(loaded_arrays[name], array, err_msg=name)
+
+    for row in range(len(store)):
+        assert dict(ForecastRecord(loaded, row)) == dict(ForecastRecord(store, row))
+
+
+def test_build_snapshot_matches_source(forecast_file, forecast_data):
+    path = forecast_snapshot.build_snapshot(forecast_file)
+    assert path == forecast_file.with_suffix(".snapshot")
+    assert forecast_snapshot.is_fresh(path, forecast_file)
+
+    store, metadata, header = forecast_snapshot.read_snapshot(path)
+    assert metadata == forecast_data["metadata"]
+    assert header["source"]["sha256"] == forecast_snapshot.file_sha256(forecast_file)
+    assert [dict(ForecastRecord(store, row)) for row in range(len(store))] == forecast_data[
+        "forecasts"
+    ]
+
+
+def test_stale_after_source_changes(forecast_file, forecast_data):
+    path = forecast_snapshot.build_snapshot(forecast_file)
+    stat = forecast_file.stat()
+
+    # A copy with a new mtime but the same bytes is still fresh
+    os.utime(forecast_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert forecast_snapshot.is_fresh(path, forecast_file)
+
+    # Same size and mtime, different bytes: caught by the hash
+    forecast_data["forecasts"][0]["country_name"] = "Côte d’Ivoirx"
+    forecast_file.write_text(json.dumps(forecast_data, ensure_ascii=False), encoding="utf-8")
+    assert forecast_file.stat().st_size == stat.st_size
+    os.utime(forecast_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert not forecast_snapshot.is_fresh(path, forecast_file)
+
+    forecast_data["version"] = 3
+    forecast_file.write_text(json.dumps(forecast_data, ensure_ascii=False), encoding="utf-8")
+    assert not forecast_snapshot.is_fresh(path, forecast_file)
+
+
+def _rewrite_header(path, **changes):
+    header, data_start = forecast_snapshot._read_header(path)
+    header.update(changes)
+    encoded = json.dumps(header).encode("utf-8")
+    length = data_start - len(forecast_snapshot.MAGIC) - 8
+    assert len(encoded) <= length
+    with path.open("r+b") as f:
+        f.seek(len(forecast_snapshot.MAGIC))
+        f.write(struct.pack("<Q", length))
+        f.write(encoded.ljust(length))
+
+
+@pytest.mark.parametrize("schema_version", [forecast_snapshot.SCHEMA_VERSION - 1, None])
+def test_wrong_schema_rejected(forecast_file, schema_version):
+    path = forecast_snapshot.build_snapshot(forecast_file)
+    _rewrite_header(path, schema_version=schema_version)
+
+    assert not forecast_snapshot.is_fresh(path, forecast_file)
+    with pytest.raises(ValueError, match="schema version"):
+        forecast_snapshot.read_snapshot(path)
+
+
+def test_not_a_snapshot_rejected(tmp_path, forecast_file):
+    path = tmp_path / "forecast_data.snapshot"
+    path.write_bytes(b"NOTASNAP" + b"\0" * 64)
+
+    assert not forecast_snapshot.is_fresh(path, forecast_file)
+    assert not forecast_snapshot.is_fresh(tmp_path / "missing.snapshot", forecast_file)
+    with pytest.raises(ValueError, match="not a forecast snapshot"):
+        forecast_snapshot.read_snapshot(path)
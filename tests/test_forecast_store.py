@@ -0,0 +1,204 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from data_loader import ForecastDataLoader
+import forecast_shards
+import forecast_snapshot
+from forecast_store import ForecastRecord, build_store
+
+HISTORY_LENGTHS = [0, 1, 5, 6, 7, 13, 40]
+
+
+def _history(length: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        {"date": f"{2000 + i // 12}-{i % 12 + 1:02d}", "fatalities": rng.randint(0, 500)}
+        for i in range(length)
+    ]
+
+
+def _slice_mean(fatalities, window):
+    """The temporal chart's original per-point slice sum."""
+    return [
+        sum(fatalities[i - window + 1 : i + 1]) / window if i >= window - 1 else None
+        for i in range(len(fatalities))
+    ]
+
+
+@pytest.fixture
+def history_store():
+    # Countries in pairs share a history, so histories are deduplicated
+    # across rows; each country also has two forecast periods
+    forecasts = []
+    for idx, length in enumerate(HISTORY_LENGTHS * 2):
+        for month in (1, 2):
+            forecasts.append(
+                {
+                    "country_code": f"C{idx:02d}",
+                    "month": month,
+                    "year": 2026,
+                    "historical": {"monthly_data": _history(length, idx % len(HISTORY_LENGTHS))},
+                }
+            )
+    return build_store(forecasts), forecasts
+
+
+@pytest.mark.parametrize("window", [1, 3, 6, 12])
+def test_rolling_means_match_slice_sums(history_store, window):
+    store, forecasts = history_store
+    assert len(store.history_offsets) - 1 == len(HISTORY_LENGTHS)
+
+    means = store.rolling_means(window)
+    assert means.shape == store.history_fatalities.shape
+    for row, forecast in enumerate(forecasts):
+        fatalities = [p["fatalities"] for p in forecast["historical"]["monthly_data"]]
+        start, end = store.history_bounds(row)
+        assert end - start == len(fatalities)
+        expected = _slice_mean(fatalities, window)
+        got = means[start:end].tolist()
+        for i, (value, reference) in enumerate(zip(got, expected)):
+            if reference is None:
+                assert np.isnan(value), (row, i)
+            else:
+                assert value == pytest.approx(reference, rel=1e-12), (row, i)
+
+
+def test_rolling_means_cached_per_window(history_store):
+    store, _ = history_store
+    assert store.rolling_means(6) is store.rolling_means(6)
+    assert store.rolling_means(3) is not store.rolling_means(6)
+
+
+def _region_fixture(forecast_data):
+    """
+    forecast_data with varied regions: JPN without regional context, TUR
+    with a shorter list in another order. Returns (data, expected), where
+    expected maps (code, month, year) to the embedded list or None.
+    """
+    expected = {}
+    for forecast in forecast_data["forecasts"]:
+        context = forecast["regional_context"]
+        if forecast["country_code"] == "JPN":
+            del forecast["regional_context"]
+            context = None
+        elif forecast["country_code"] == "TUR":
+            context = [context[2], context[0], context[3]]
+            forecast["regional_context"] = context
+        expected[(forecast["country_code"], forecast["month"], forecast["year"])] = context
+    return forecast_data, expected
+
+
+def _with_named_regions(data, regions_first):
+    """The same data with a "region" name per forecast and a top-level table."""
+    regions = {}
+    forecasts = []
+    for forecast in data["forecasts"]:
+        forecast = dict(forecast)
+        context = forecast.pop("regional_context", None)
+        if context is not None:
+            members = [entry["country_code"] for entry in context]
+            name = f"Region {'-'.join(members)}"
+            regions[name] = members
+            forecast["region"] = name
+        forecasts.append(forecast)
+    if regions_first:
+        return {"metadata": data["metadata"], "regions": regions, "forecasts": forecasts}
+    return {"metadata": data["metadata"], "forecasts": forecasts, "regions": regions}
+
+
+def _named(context):
+    # The regions table holds codes only: a country with no forecast of
+    # its own has no name but its code
+    if context is None:
+        return None
+    return [
+        dict(entry, country_name="GHA") if entry["country_code"] == "GHA" else entry
+        for entry in context
+    ]
+
+
+def _check_regional_context(loader, expected):
+    for (code, month, year), context in expected.items():
+        record = loader.get_forecast(code, month, year)
+        if context is None:
+            assert "regional_context" not in record
+            assert record.get("regional_context") is None
+        else:
+            assert record["regional_context"] == context, (loader.loaded_from, code, month, year)
+
+
+def test_embedded_regional_context(forecast_data):
+    data, expected = _region_fixture(forecast_data)
+    store = build_store(data["forecasts"])
+    for row, forecast in enumerate(data["forecasts"]):
+        key = (forecast["country_code"], forecast["month"], forecast["year"])
+        assert dict(ForecastRecord(store, row)).get("regional_context") == expected[key]
+    # One region per distinct neighbour list, not per forecast
+    assert len(store.region_offsets) - 1 == 2
+
+
+@pytest.mark.parametrize("regions_first", [True, False])
+def test_named_regions(tmp_path, forecast_data, regions_first):
+    data, expected = _region_fixture(forecast_data)
+    path = tmp_path / "forecast_data.json"
+    path.write_text(json.dumps(_with_named_regions(data, regions_first)), encoding="utf-8")
+    keys = list(json.loads(path.read_text(encoding="utf-8")))
+    assert (keys.index("regions") < keys.index("forecasts")) == regions_first
+
+    loader = ForecastDataLoader(str(path), str(tmp_path / "none.snapshot"))
+    assert loader.loaded_from == "json"
+    # Placeholders for names read before the table are all resolved
+    assert (loader.store.region >= -1).all()
+    _check_regional_context(loader, {k: _named(v) for k, v in expected.items()})
+
+
+@pytest.mark.parametrize("layout", ["snapshot", "shards"])
+@pytest.mark.parametrize("source", ["embedded", "named"])
+def test_regions_in_snapshot_and_shards(tmp_path, forecast_data, layout, source):
+    data, expected = _region_fixture(forecast_data)
+    if source == "named":
+        data = _with_named_regions(data, regions_first=False)
+        expected = {k: _named(v) for k, v in expected.items()}
+    path = tmp_path / "forecast_data.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    if layout == "snapshot":
+        loader = ForecastDataLoader(str(path), str(forecast_snapshot.build_snapshot(path)))
+    else:
+        shard_dir = forecast_shards.build_shards(path, tmp_path / "shards")
+        loader = ForecastDataLoader(str(shard_dir), str(tmp_path / "none.snapshot"))
+    assert loader.loaded_from == layout
+    _check_regional_context(loader, expected)
+
+
+def test_neighbour_values_come_from_their_own_forecasts(tmp_path, forecast_data):
+    # Values embedded in a source regional_context are not kept: each
+    # neighbour shows its own forecast for the period. One without a
+    # forecast of its own used to show its embedded values; it is now
+    # listed by code and name only and left out of the comparison chart
+    forecasts = forecast_data["forecasts"]
+    civ = forecasts[0]
+    context = civ["regional_context"]
+    context[1] = dict(context[1], probability=0.999, predicted_fatalities=1e6)
+    context[3] = dict(context[3], probability=0.05, predicted_fatalities=3.0)
+    path = tmp_path / "forecast_data.json"
+    path.write_text(json.dumps(forecast_data), encoding="utf-8")
+    loader = ForecastDataLoader(str(path), str(tmp_path / "none.snapshot"))
+
+    record = loader.get_forecast("CIV", civ["month"], civ["year"])
+    jpn = loader.get_forecast("JPN", civ["month"], civ["year"])
+    assert record["regional_context"][1] == {
+        "country_code": "JPN",
+        "country_name": "日本",
+        "probability": jpn["forecast"]["probability"],
+        "predicted_fatalities": jpn["forecast"]["predicted_fatalities"],
+    }
+    assert record["regional_context"][3] == {"country_code": "GHA", "country_name": "Ghana"}
+
+    regional = loader.get_regional_comparison(record)
+    assert regional["names"].tolist() == ["Côte d’Ivoire", "日本", "Türkiye"]
+    assert regional["probability"][1] == jpn["forecast"]["probability"]
+    assert regional["is_target"].tolist() == [True, False, False]
@@ -0,0 +1,108 @@
+import config
+import data_loader
+import http_cache
+
+CONTEXT = {"country_code": "JPN", "month": 1, "year": 2026}
+
+
+def _post(client, output, inputs, state=(), headers=None):
+    component, prop = output.split("@")[0].split(".")
+    body = {
+        "output": output,
+        "outputs": {"id": component, "property": prop},
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+        "state": [{"id": i, "property": p, "value": v} for i, p, v in state],
+        "changedPropIds": [f"{i}.{p}" for i, p, _ in inputs],
+    }
+    return client.post(http_cache.CALLBACK_PATH, json=body, headers=headers or {})
+
+
+def _temporal_chart(client, headers=None, context=CONTEXT):
+    return _post(
+        client, "temporal-chart.figure", [("detail-context", "data", context)], headers=headers
+    )
+
+
+def test_cacheable_callback_gets_etag_and_304(client):
+    response = _temporal_chart(client)
+    assert response.status_code == 200
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert response.cache_control.public
+    assert response.cache_control.max_age == config.HTTP_CACHE_MAX_AGE
+
+    repeat = _temporal_chart(client, headers={"If-None-Match": f'"{etag}"'})
+    assert repeat.status_code == 304
+    assert repeat.get_data() == b""
+    assert repeat.get_etag() == (etag, False)
+    assert repeat.cache_control.max_age == config.HTTP_CACHE_MAX_AGE
+
+    other = _temporal_chart(client, context=dict(CONTEXT, month=2))
+    assert other.status_code == 200
+    assert other.get_etag()[0] != etag
+    assert _temporal_chart(client, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_compressed_response_revalidates(client):
+    response = _temporal_chart(client, headers={"Accept-Encoding": "gzip"})
+    etag, weak = response.get_etag()
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert weak
+
+    repeat = _temporal_chart(
+        client, headers={"Accept-Encoding": "gzip", "If-None-Match": f'W/"{etag}"'}
+    )
+    assert repeat.status_code == 304
+
+
+def test_non_deterministic_output_has_no_etag(client):
+    dependencies = client.get("/_dash-dependencies").get_json()
+    (output,) = [
+        d["output"]
+        for d in dependencies
+        if [i["id"] for i in d["inputs"]] == ["month-selector"]
+    ]
+    assert output.split("@")[0] not in http_cache.CACHEABLE_OUTPUTS
+
+    response = _post(
+        client,
+        output,
+        [("month-selector", "value", "2-2026")],
+        state=[("url", "pathname", "/country/JPN/1-2026")],
+    )
+    assert response.status_code == 200
+    assert response.get_json()["response"]["url"]["pathname"] == "/country/JPN/2-2026"
+    assert response.get_etag() == (None, None)
+    assert not response.cache_control.public
+    assert response.cache_control.max_age is None
+
+
+def test_etag_depends_on_data_version():
+    body = {"output": "temporal-chart.figure", "inputs": [{"value": CONTEXT}]}
+    assert http_cache.callback_etag(body, "v1") == http_cache.callback_etag(dict(body), "v1")
+    assert http_cache.callback_etag(body, "v1") != http_cache.callback_etag(body, "v2")
+    assert http_cache.callback_etag(dict(body, output="url.pathname"), "v1") is None
+
+
+def test_no_etag_after_reload_during_request(client, loader, monkeypatch):
+    # The callback runs against a release that is swapped out before it returns
+    original = data_loader.ForecastDataLoader.get_forecast
+    calls = []
+
+    def reload_midway(self, *args):
+        calls.append(args)
+        monkeypatch.setattr(loader, "version", "next-release")
+        return original(self, *args)
+
+    monkeypatch.setattr(data_loader.ForecastDataLoader, "get_forecast", reload_midway)
+    response = _temporal_chart(client, context=dict(CONTEXT, month=12, year=2025))
+    assert calls
+    assert response.status_code == 200
+    assert response.get_etag() == (None, None)
+
+
+def test_static_routes_are_conditional(client):
+    response = client.get("/_dash-layout")
+    etag, _ = response.get_etag()
+    assert etag
+    assert client.get("/_dash-layout", headers={"If-None-Match": f'"{etag}"'}).status_code == 304
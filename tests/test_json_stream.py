@@ -0,0 +1,66 @@
+import hashlib
+import io
+import json
+
+import pytest
+
+import json_stream
+
+
+def _read(raw: bytes, **kwargs):
+    top_level = {}
+    digest = hashlib.sha256()
+    records = list(json_stream.iter_forecasts(io.BytesIO(raw), top_level, digest=digest, **kwargs))
+    return records, top_level, digest.hexdigest()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_forecasts_across_chunk_boundaries(monkeypatch, forecast_data, chunk_size, indent):
+    # Small chunks split keys, numbers and multi-byte characters between reads
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", chunk_size)
+    raw = json.dumps(forecast_data, ensure_ascii=False, indent=indent).encode("utf-8")
+    assert any(b > 0x7F for b in raw)
+
+    records, top_level, digest = _read(raw)
+
+    assert records == forecast_data["forecasts"]
+    assert top_level == {"metadata": forecast_data["metadata"], "version": 2}
+    assert digest == hashlib.sha256(raw).hexdigest()
+
+
+def test_iter_forecasts_number_at_end_of_chunk(monkeypatch):
+    raw = b'{"forecasts": [12345, 6.25e3, -7], "count": 1234567}'
+    for chunk_size in range(1, len(raw) + 1):
+        monkeypatch.setattr(json_stream, "CHUNK_SIZE", chunk_size)
+        records, top_level, _ = _read(raw)
+        assert records == [12345, 6250.0, -7]
+        assert top_level == {"count": 1234567}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+def test_iter_forecasts_empty_array(monkeypatch, chunk_size):
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", chunk_size)
+    raw = '{"metadata": {"source": "Prévisions"}, "forecasts": [ ], "version": 2}\n'.encode("utf-8")
+
+    records, top_level, digest = _read(raw)
+
+    assert records == []
+    assert top_level == {"metadata": {"source": "Prévisions"}, "version": 2}
+    assert digest == hashlib.sha256(raw).hexdigest()
+
+
+def test_iter_forecasts_empty_object():
+    records, top_level, digest = _read(b"{ }\n")
+    assert records == []
+    assert top_level == {}
+    assert digest == hashlib.sha256(b"{ }\n").hexdigest()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [b"[]", b'{"forecasts": [1, 2}', b'{"forecasts": [1, 2]', b'{"forecasts" [1]}'],
+)
+def test_iter_forecasts_rejects_malformed_input(raw):
+    with pytest.raises(ValueError):
+        _read(raw)
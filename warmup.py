@@ -0,0 +1,193 @@
+"""
+Cache warmup: precompute map figures, detail charts and detail pages for a
+loader so the first visitors of a release hit warm caches.
+
+Figures are built in a concurrent.futures process pool, one task per
+forecast period (maps) and per country (charts), and collected into this
+process's caches. How much is built follows the cache sizes: every map,
+then detail views from the latest period backwards until the chart cache is
+full. The period grid and rolling means behind the charts are computed for
+the whole store when it loads (ForecastDataLoader._build_indexes).
+
+When the calling process has no other threads (the gunicorn master before
+forking), pool workers are forked and inherit the loaded data; otherwise
+they are spawned and load the same data files themselves. After a reload
+every gunicorn worker warms its own caches, so unless FAST_WARMUP_JOBS is
+set the figures are then built in-process rather than in a pool per worker.
+
+Runs at boot from gunicorn.conf.py and, once install() is called, after
+every data reload. Controlled by FAST_WARMUP and FAST_WARMUP_JOBS.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import config
+import data_loader
+from figures import attach_template, detach_template
+import layout
+
+logger = logging.getLogger(__name__)
+
+SCALE_MODES = ("absolute", "log")
+
+_worker_loader = None
+
+
+def _init_worker(data_path: str, snapshot_path: str, version: str) -> None:
+    global _worker_loader
+    loader = data_loader.preload()
+    if loader.version != version:
+        loader = data_loader.ForecastDataLoader(data_path, snapshot_path)
+    if loader.version != version:
+        raise RuntimeError(f"Data changed during warmup ({version[:12]} -> {loader.version[:12]})")
+    _worker_loader = loader
+
+
+def build_maps(month: int, year: int, loader) -> List[Tuple[Tuple, Dict]]:
+    """[((month, year, scale_mode), figure), ...] for one period."""
+    forecasts = loader.get_forecasts_for_period(month, year)
+    return [
+        ((month, year, scale_mode), layout.create_map_figure(forecasts, scale_mode))
+        for scale_mode in SCALE_MODES
+    ]
+
+
+def build_charts(
+    country_code: str, periods: List[Tuple[int, int]], loader
+) -> List[Tuple[Tuple, Dict]]:
+    """[((chart, code, month, year), figure), ...] for one country's periods."""
+    results = []
+    for month, year in periods:
+        forecast = loader.get_forecast(country_code, month, year)
+        if forecast is None:
+            continue
+        for chart, build in layout.DETAIL_CHARTS.items():
+            results.append(((chart, country_code, month, year), build(forecast, loader)))
+    return results
+
+
+# The shared template is re-attached on arrival instead of pickled per figure
+def _maps_task(month: int, year: int) -> List[Tuple[Tuple, Dict]]:
+    return [(key, detach_template(fig)) for key, fig in build_maps(month, year, _worker_loader)]
+
+
+def _charts_task(country_code: str, periods: List[Tuple[int, int]]) -> List[Tuple[Tuple, Dict]]:
+    return [
+        (key, detach_template(fig))
+        for key, fig in build_charts(country_code, periods, _worker_loader)
+    ]
+
+
+def _detail_views(loader) -> Dict[str, List[Tuple[int, int]]]:
+    """country -> periods to warm, latest periods first, as many as the caches hold."""
+    limit = min(
+        config.DETAIL_CHART_CACHE_SIZE // len(layout.DETAIL_CHARTS),
+        config.DETAIL_PAGE_CACHE_SIZE,
+    )
+    views: Dict[str, List[Tuple[int, int]]] = {}
+    count = 0
+    for period in reversed(loader.get_available_periods()):
+        month, year = period["month"], period["year"]
+        for code in loader.get_forecasts_for_period(month, year):
+            if count >= limit:
+                return views
+            views.setdefault(code, []).append((month, year))
+            count += 1
+    return views
+
+
+def _pool_context():
+    if threading.active_count() == 1 and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def warm_caches(loader, jobs: int = None) -> Dict[str, float]:
+    """
+    Fill the map, detail chart and detail page caches for `loader`.
+    jobs: worker processes (default config.WARMUP_JOBS; 0 = CPU count,
+    1 = build in this process). Returns counts and elapsed seconds.
+    """
+    start = time.perf_counter()
+    if jobs is None:
+        jobs = config.WARMUP_JOBS
+    jobs = jobs or os.cpu_count() or 1
+
+    periods = loader.get_available_periods()
+    max_maps = config.MAP_FIGURE_CACHE_SIZE // len(SCALE_MODES)
+    map_periods = [(p["month"], p["year"]) for p in periods[::-1][:max_maps]]
+    views = _detail_views(loader)
+    stats = {"maps": 0, "charts": 0, "pages": 0}
+
+    def collect(kind: str, results) -> None:
+        for key, figure in results:
+            if kind == "maps":
+                layout.prime_map_figure(loader, *key, figure)
+            else:
+                layout.prime_detail_chart(loader, *key, figure)
+            stats[kind] += 1
+
+    total = len(map_periods) + len(views)
+    logger.info(
+        "Warming caches for %s: %d periods, %d countries, %d job(s)",
+        loader.version[:12], len(map_periods), len(views), jobs,
+    )
+    if jobs == 1:
+        for month, year in map_periods:
+            collect("maps", build_maps(month, year, loader))
+        for code, view_periods in views.items():
+            collect("charts", build_charts(code, view_periods, loader))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, max(total, 1)),
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(str(loader.data_path), str(loader.snapshot_path), loader.version),
+        ) as pool:
+            tasks = {pool.submit(_maps_task, m, y): "maps" for m, y in map_periods}
+            tasks.update(
+                {pool.submit(_charts_task, code, p): "charts" for code, p in views.items()}
+            )
+            step = max(1, total // 10)
+            for done, task in enumerate(as_completed(tasks), 1):
+                collect(tasks[task], [(key, attach_template(fig)) for key, fig in task.result()])
+                if done % step == 0 or done == total:
+                    logger.info("Warmup %d/%d tasks (%d%%)", done, total, done * 100 // total)
+
+    # Page skeletons are cheap and hold Dash components; build them here
+    for code, view_periods in views.items():
+        for month, year in view_periods:
+            layout.get_detail_page(code, month, year, loader)
+            stats["pages"] += 1
+
+    stats["seconds"] = time.perf_counter() - start
+    logger.info(
+        "Warmed %d maps, %d charts, %d pages in %.1fs",
+        stats["maps"], stats["charts"], stats["pages"], stats["seconds"],
+    )
+    return stats
+
+
+def _on_reload(loader) -> None:
+    try:
+        # A pool per gunicorn worker would load the data once per process
+        warm_caches(loader, jobs=config.WARMUP_JOBS or 1)
+    except Exception:
+        logger.exception("Cache warmup failed for %s", loader.version[:12])
+
+
+_installed = False
+
+
+def install() -> None:
+    """Warm the caches after every data reload when FAST_WARMUP is set."""
+    global _installed
+    if config.WARMUP_ENABLED and not _installed:
+        # Registered after layout's listeners, so it runs once they have cleared the caches
+        data_loader.add_reload_listener(_on_reload)
+        _installed = True